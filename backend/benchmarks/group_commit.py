@@ -0,0 +1,91 @@
+"""Compare per-request insert_one against group-committed order inserts.
+
+Run from the backend directory against a real MongoDB (results against an
+in-memory stand-in say nothing about round trips):
+
+    MONGO_URL=mongodb://localhost:27017 python -m benchmarks.group_commit --orders 5000 --concurrency 200
+
+The benchmark writes into a scratch database that is dropped afterwards.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+import uuid
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from utils.group_commit import GroupCommitter
+
+
+def make_order():
+    return {
+        "order_id": f"BENCH{uuid.uuid4().hex[:12].upper()}",
+        "customer_name": "Bench",
+        "customer_phone": "9999999999",
+        "delivery_type": "pickup",
+        "items": [{"item_id": 101, "name": "Veg Tandoori Momos", "price": 80, "quantity": 2}],
+        "subtotal": 160,
+        "delivery_charge": 0,
+        "total": 160,
+        "payment_method": "cod",
+        "payment_status": "pending",
+        "order_status": "pending",
+    }
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run(insert, total, concurrency):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            await insert(make_order())
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(total)])
+    elapsed = time.perf_counter() - started
+    return {
+        "orders": total,
+        "seconds": round(elapsed, 3),
+        "throughput_per_s": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+async def main(args):
+    client = AsyncIOMotorClient(args.mongo_url)
+    db = client[args.db_name]
+    try:
+        await db.orders.create_index("order_id", unique=True)
+        results = {"insert_one": await run(db.orders.insert_one, args.orders, args.concurrency)}
+        await db.orders.delete_many({})
+
+        committer = GroupCommitter(db.orders, window_ms=args.window_ms, max_batch=args.max_batch)
+        results["group_commit"] = await run(committer.insert, args.orders, args.concurrency)
+        results["group_commit"]["batches"] = committer.batches
+        print(json.dumps(results, indent=2))
+    finally:
+        await client.drop_database(args.db_name)
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--db-name", default="bench_group_commit")
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--window-ms", type=float, default=2)
+    parser.add_argument("--max-batch", type=int, default=64)
+    asyncio.run(main(parser.parse_args()))
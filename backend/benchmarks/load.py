@@ -0,0 +1,218 @@
+"""In-process load and latency benchmark for the public API.
+
+Drives the FastAPI ``app`` over ASGI with httpx (no network, no uvicorn)
+against either a scratch database on a local MongoDB or the in-memory
+``mongomock_motor`` stand-in, and reports throughput and p50/p95/p99 latency
+per endpoint profile. Run from the backend directory:
+
+    python -m benchmarks.load --backend memory
+    MONGO_URL=mongodb://localhost:27017 python -m benchmarks.load --backend mongo --output bench.json
+    python -m benchmarks.load --backend memory --compare bench.json
+
+Profiles can be tuned with ``--profile name=concurrency:requests`` and
+restricted with ``--only``. ``--compare`` exits non-zero when any profile's
+p95 latency or throughput regresses by more than ``--tolerance``.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+# Every request comes from one client and phone; the profiles measure the endpoints, not the limiter
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import httpx
+
+import server
+
+ORDER_BODY = {
+    "customer_name": "Bench Customer",
+    "customer_phone": "9999999999",
+    "customer_email": "bench@example.com",
+    "delivery_address": "Zila School Rd, Bhagalpur",
+    "delivery_type": "delivery",
+    "items": [{"item_id": 101, "quantity": 2}, {"item_id": 202, "quantity": 1}],
+    "payment_method": "cod",
+}
+
+# name -> (concurrency, requests)
+DEFAULT_PROFILES = {
+    "menu_browse": (50, 2000),
+    "order_create": (20, 500),
+    "order_lookup": (50, 2000),
+    "review_submit": (20, 500),
+    "contact_submit": (20, 500),
+}
+
+
+async def menu_browse(client, i, state):
+    path = ("/api/menu/categories", "/api/menu/items", "/api/restaurant/info")[i % 3]
+    return await client.get(path)
+
+
+async def order_create(client, i, state):
+    return await client.post("/api/orders", json=ORDER_BODY)
+
+
+async def order_lookup(client, i, state):
+    order_ids = state["order_ids"]
+    return await client.get(f"/api/orders/{order_ids[i % len(order_ids)]}")
+
+
+async def review_submit(client, i, state):
+    return await client.post("/api/reviews", json={"name": "Bench Reviewer", "rating": 5, "review": f"Benchmark review {i}"})
+
+
+async def contact_submit(client, i, state):
+    return await client.post("/api/contact", json={"name": "Bench", "phone": "9999999999", "message": f"Benchmark message {i}"})
+
+
+PROFILE_REQUESTS = {
+    "menu_browse": menu_browse,
+    "order_create": order_create,
+    "order_lookup": order_lookup,
+    "review_submit": review_submit,
+    "contact_submit": contact_submit,
+}
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run_profile(client, name, concurrency, total, state):
+    make_request = PROFILE_REQUESTS[name]
+    latencies = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            response = await make_request(client, i, state)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput_per_s": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def open_database(args):
+    if args.backend == "memory":
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            sys.exit("The memory backend needs mongomock-motor (pip install mongomock-motor)")
+        client = AsyncMongoMockClient()
+    else:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(args.mongo_url)
+    return client, client[args.db_name]
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+async def main(args):
+    profiles = dict(DEFAULT_PROFILES)
+    for override in args.profile:
+        name, _, shape = override.partition("=")
+        concurrency, _, total = shape.partition(":")
+        profiles[name] = (int(concurrency), int(total or profiles[name][1]))
+    if args.only:
+        profiles = {name: profiles[name] for name in args.only}
+
+    # Per-request INFO logging would dominate the measurements
+    logging.getLogger().setLevel(args.log_level)
+
+    mongo_client, db = open_database(args)
+    server.set_db(db)
+    await server.startup_event()
+
+    results = {}
+    transport = httpx.ASGITransport(app=server.app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            # Orders to look up, created outside the measured window
+            created = [await client.post("/api/orders", json=ORDER_BODY) for _ in range(50)]
+            state = {"order_ids": [response.json()["order_id"] for response in created if response.status_code == 200]}
+
+            for name, (concurrency, total) in profiles.items():
+                results[name] = await run_profile(client, name, concurrency, total, state)
+                print(f"{name:16} {json.dumps(results[name])}")
+    finally:
+        await server.shutdown_db_client()
+        if args.backend == "mongo":
+            await mongo_client.drop_database(args.db_name)
+            mongo_client.close()
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "backend": args.backend,
+        "python": platform.python_version(),
+        "profiles": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if not compare(baseline, report, args.tolerance):
+            sys.exit(1)
+
+
+def compare(baseline, current, tolerance):
+    """Print per-profile deltas; return False if anything regressed past ``tolerance``"""
+    ok = True
+    for name, result in current["profiles"].items():
+        before = baseline.get("profiles", {}).get(name)
+        if before is None:
+            continue
+        p95_change = (result["p95_ms"] - before["p95_ms"]) / before["p95_ms"]
+        throughput_change = (result["throughput_per_s"] - before["throughput_per_s"]) / before["throughput_per_s"]
+        regressed = p95_change > tolerance or throughput_change < -tolerance
+        ok = ok and not regressed
+        print(f"{name:16} p95 {p95_change:+.1%}  throughput {throughput_change:+.1%}{'  REGRESSION' if regressed else ''}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=["memory", "mongo"], default="memory")
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL"))
+    parser.add_argument("--db-name", default="bench_load")
+    parser.add_argument("--profile", action="append", default=[], metavar="NAME=CONCURRENCY:REQUESTS")
+    parser.add_argument("--only", action="append", choices=sorted(DEFAULT_PROFILES))
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--compare", help="baseline JSON written by --output")
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression (default 0.2)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,85 @@
+"""Per-page CPU cost of the order list response: model round trip vs trusted rows.
+
+Compares what ``GET /api/orders`` used to do for a page of orders (build
+``Order(**doc)`` per document, then let FastAPI validate and serialize the list
+through ``response_model`` and encode it with ``json``) against the current
+path (projected documents, ``TrustedRows`` and orjson). No database needed:
+
+    python -m benchmarks.serialization --page-size 50 --items 3 --rounds 2000
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from models.order import Order
+from utils.fast_json import ORJSONResponse, TrustedRows
+
+
+def make_documents(page_size, items):
+    now = datetime.utcnow().replace(microsecond=123000)
+    return [
+        {
+            "order_id": f"ORD{i:08X}",
+            "customer_name": "Rahul Kumar",
+            "customer_phone": "9999999999",
+            "customer_email": "rahul@example.com",
+            "delivery_address": "Zila School Rd, Adampur, Bhagalpur, Bihar 812001",
+            "delivery_type": "delivery",
+            "items": [{"item_id": 101 + j, "name": "Veg Tandoori Momos", "price": 80, "quantity": 2} for j in range(items)],
+            "subtotal": 160 * items,
+            "delivery_charge": 30,
+            "total": 160 * items + 30,
+            "payment_method": "cod",
+            "payment_status": "pending",
+            "order_status": "pending",
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(page_size)
+    ]
+
+
+async def model_round_trip(documents, field):
+    content = [Order(**document) for document in documents]
+    serialized = await serialize_response(field=field, response_content=content)
+    return json.dumps(jsonable_encoder(serialized), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+async def trusted_rows(documents, rows):
+    return ORJSONResponse(rows.rows(documents)).body
+
+
+async def measure(label, fn, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        await fn()
+    per_page = (time.perf_counter() - started) / rounds
+    print(f"{label:18} {per_page * 1e6:9.1f} us/page")
+    return per_page
+
+
+async def main(args):
+    documents = make_documents(args.page_size, args.items)
+    field = create_response_field(name="Response_get_orders", type_=List[Order], mode="serialization")
+    rows = TrustedRows(Order)
+
+    assert json.loads(await model_round_trip(documents, field)) == json.loads(await trusted_rows(documents, rows))
+
+    before = await measure("model round trip", lambda: model_round_trip(documents, field), args.rounds)
+    after = await measure("trusted rows", lambda: trusted_rows(documents, rows), args.rounds)
+    print(f"saved {(before - after) * 1e6:.1f} us per page ({before / after:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--items", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=2000)
+    asyncio.run(main(parser.parse_args()))
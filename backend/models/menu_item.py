@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional
 from datetime import datetime
 
 class MenuItem(BaseModel):
@@ -18,8 +18,38 @@ class MenuItemCreate(BaseModel):
     item_id: int
     name: str
     description: str
-    price: int
+    price: int = Field(gt=0)
     category: str
     image: str
     is_veg: bool
-    is_available: bool = True
\ No newline at end of file
+    is_available: bool = True
+
+class MenuItemSelector(BaseModel):
+    # Items are chosen by id, by category, or both (either match)
+    item_ids: List[int] = []
+    category: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_target(self):
+        if not self.item_ids and not self.category:
+            raise ValueError("item_ids or category is required")
+        return self
+
+class MenuAvailabilityChange(MenuItemSelector):
+    is_available: bool
+
+class MenuPriceChange(MenuItemSelector):
+    # Either a new absolute price or a delta added to the current one
+    price: Optional[int] = Field(None, gt=0)
+    delta: Optional[int] = None
+
+    @model_validator(mode="after")
+    def check_change(self):
+        if (self.price is None) == (self.delta is None):
+            raise ValueError("exactly one of price or delta is required")
+        return self
+
+class MenuBulkUpdate(BaseModel):
+    upserts: List[MenuItemCreate] = []
+    availability: List[MenuAvailabilityChange] = []
+    prices: List[MenuPriceChange] = []
\ No newline at end of file
@@ -1,7 +1,21 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import datetime
-import uuid
+from utils.ids import new_order_id
+
+ORDER_STATUSES = ("pending", "confirmed", "preparing", "out_for_delivery", "delivered", "cancelled")
+PAYMENT_STATUSES = ("pending", "completed", "failed")
+ACTIVE_ORDER_STATUSES = ("pending", "confirmed", "preparing", "out_for_delivery")
+
+# Allowed order_status moves; pickup orders go straight from preparing to delivered
+ORDER_STATUS_TRANSITIONS = {
+    "pending": ("confirmed", "cancelled"),
+    "confirmed": ("preparing", "cancelled"),
+    "preparing": ("out_for_delivery", "delivered", "cancelled"),
+    "out_for_delivery": ("delivered", "cancelled"),
+    "delivered": (),
+    "cancelled": (),
+}
 
 class OrderItem(BaseModel):
     item_id: int
@@ -9,8 +23,19 @@ class OrderItem(BaseModel):
     price: int
     quantity: int
 
+# Per line; also keeps quantity * price well inside BSON int64
+MAX_ITEM_QUANTITY = 100
+
+class OrderItemCreate(BaseModel):
+    # name and price are resolved server-side from the menu; any values sent
+    # by the client are accepted for compatibility but ignored
+    item_id: int
+    quantity: int = Field(gt=0, le=MAX_ITEM_QUANTITY)
+    name: Optional[str] = None
+    price: Optional[int] = None
+
 class Order(BaseModel):
-    order_id: str = Field(default_factory=lambda: f"ORD{str(uuid.uuid4())[:8].upper()}")
+    order_id: str = Field(default_factory=new_order_id)
     customer_name: str
     customer_phone: str
     customer_email: Optional[str] = None
@@ -18,8 +43,11 @@ class Order(BaseModel):
     delivery_type: str
     items: List[OrderItem]
     subtotal: int
+    discount: int = 0
     delivery_charge: int
+    tax: int = 0
     total: int
+    promo_code: Optional[str] = None
     payment_method: str
     payment_status: str = "pending"
     order_status: str = "pending"
@@ -32,5 +60,18 @@ class OrderCreate(BaseModel):
     customer_email: Optional[str] = None
     delivery_address: Optional[str] = None
     delivery_type: str
-    items: List[OrderItem]
-    payment_method: str
\ No newline at end of file
+    items: List[OrderItemCreate] = Field(min_length=1)
+    payment_method: str
+    promo_code: Optional[str] = Field(None, max_length=32)
+
+class CartQuote(BaseModel):
+    delivery_type: str
+    items: List[OrderItemCreate] = Field(min_length=1)
+    promo_code: Optional[str] = Field(None, max_length=32)
+
+class OrderQuoteRequest(BaseModel):
+    carts: List[CartQuote] = Field(min_length=1, max_length=20)
+
+class OrderStatusUpdate(BaseModel):
+    order_status: Optional[Literal[ORDER_STATUSES]] = None
+    payment_status: Optional[Literal[PAYMENT_STATUSES]] = None
\ No newline at end of file
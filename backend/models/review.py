@@ -12,5 +12,5 @@ class Review(BaseModel):
 
 class ReviewCreate(BaseModel):
     name: str
-    rating: int
+    rating: int = Field(ge=1, le=5)
     review: str
\ No newline at end of file
@@ -0,0 +1,96 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from typing import Optional
+from datetime import date, datetime, timedelta
+from utils import admin, menu_cache, rollups
+from utils.fast_json import ORJSONResponse
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+MAX_RANGE_DAYS = 366
+BUCKET_PROJECTION = {"granularity": 0, "bucket": 0}
+
+def set_db(database: AsyncIOMotorDatabase):
+    global db
+    db = database
+
+def resolve_range(start: Optional[date], end: Optional[date], default_days: int):
+    """Default to the last ``default_days`` local days ending today"""
+    end = end or rollups.local_time(datetime.utcnow()).date()
+    start = start or end - timedelta(days=default_days - 1)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if (end - start).days >= MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {MAX_RANGE_DAYS} days")
+    return start, end
+
+async def read_buckets(low: str, high: str, projection: dict):
+    cursor = db[rollups.COLLECTION].find({"_id": {"$gte": low, "$lte": high}}, projection).sort("_id", 1)
+    return await cursor.to_list(None)
+
+def bucket_row(document: dict, key: str, value: str):
+    document.pop("_id")
+    document.pop("items", None)
+    row = {key: value, "orders": 0, "gross_revenue": 0, "net_revenue": 0, "by_status": {},
+           "by_payment_status": {}, "by_delivery_type": {}}
+    row.update(document)
+    return row
+
+@router.get("/daily", dependencies=[Depends(admin.require_admin)])
+async def get_daily_sales(start: Optional[date] = None, end: Optional[date] = None):
+    """Orders and revenue per day (restaurant local time), default last 30 days"""
+    try:
+        start, end = resolve_range(start, end, 30)
+        documents = await read_buckets(f"day:{start:%Y-%m-%d}", f"day:{end:%Y-%m-%d}", {**BUCKET_PROJECTION, "items": 0})
+        return ORJSONResponse([bucket_row(document, "date", document["_id"][4:]) for document in documents])
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching daily sales: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch daily sales")
+
+@router.get("/hourly", dependencies=[Depends(admin.require_admin)])
+async def get_hourly_sales(day: Optional[date] = None):
+    """Orders and revenue per hour for one local day, default today"""
+    try:
+        day = day or rollups.local_time(datetime.utcnow()).date()
+        documents = await read_buckets(f"hour:{day:%Y-%m-%d}T00", f"hour:{day:%Y-%m-%d}T23", BUCKET_PROJECTION)
+        return ORJSONResponse([bucket_row(document, "hour", document["_id"][5:]) for document in documents])
+    except Exception as e:
+        logger.error(f"Error fetching hourly sales: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch hourly sales")
+
+@router.get("/items", dependencies=[Depends(admin.require_admin)])
+async def get_item_sales(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    limit: int = Query(50, ge=1, le=500)
+):
+    """Units sold and revenue per menu item over a date range, best sellers first"""
+    try:
+        start, end = resolve_range(start, end, 30)
+        documents = await read_buckets(f"day:{start:%Y-%m-%d}", f"day:{end:%Y-%m-%d}", {"items": 1})
+
+        totals = {}
+        for document in documents:
+            for item_id, counts in document.get("items", {}).items():
+                total = totals.setdefault(item_id, {"quantity": 0, "revenue": 0})
+                total["quantity"] += counts.get("quantity", 0)
+                total["revenue"] += counts.get("revenue", 0)
+
+        snapshot = await menu_cache.get_snapshot(db)
+        rows = []
+        for item_id, total in totals.items():
+            if total["quantity"] <= 0:
+                continue
+            item = snapshot.get_item(int(item_id))
+            rows.append({"item_id": int(item_id), "name": item["name"] if item else None, **total})
+        rows.sort(key=lambda row: (-row["revenue"], -row["quantity"]))
+        return ORJSONResponse(rows[:limit])
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching item sales: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch item sales")
\ No newline at end of file
@@ -1,35 +1,119 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from typing import List
+from typing import List, Literal, Optional
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
 from models.contact import ContactMessage, ContactMessageCreate
+from utils import admin, archive, export, pagination, rate_limit, write_behind
+from utils.fast_json import ORJSONResponse, TrustedRows
+from datetime import date
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/contact", tags=["contact"])
 
+# _id builds the pagination cursor (and orders exports); listings return it as "id"
+# so staff can mark a message read
+message_rows = TrustedRows(ContactMessage, extra_fields=("_id",))
+
 def set_db(database: AsyncIOMotorDatabase):
     global db
     db = database
 
-@router.post("", response_model=ContactMessage)
+@router.post("", response_model=ContactMessage, dependencies=[Depends(rate_limit.per_ip("contact"))])
 async def create_contact_message(message_input: ContactMessageCreate):
     """Submit a contact form message"""
+    await rate_limit.enforce("contact", "phone", message_input.phone)
     try:
         message = ContactMessage(**message_input.dict())
-        await db.contact_messages.insert_one(message.dict())
+        await write_behind.insert(db, "contact_messages", message.dict())
         
         logger.info(f"Contact message received from {message.name}")
         return message
+    except write_behind.WriteBehindFull:
+        raise HTTPException(status_code=503, detail="Server is busy, please retry", headers={"Retry-After": "1"})
     except Exception as e:
         logger.error(f"Error creating contact message: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to submit message")
 
 @router.get("/messages", response_model=List[ContactMessage])
-async def get_contact_messages(limit: int = 50, offset: int = 0):
-    """Get all contact messages (admin functionality)"""
+async def get_contact_messages(
+    limit: int = 50,
+    after: Optional[str] = None,
+    offset: int = Query(0, deprecated=True)
+):
+    """Get all contact messages (admin functionality).
+
+    Pages are newest first; pass the ``X-Next-Cursor`` header of one page as
+    ``after`` to fetch the next.
+    """
     try:
-        messages = await db.contact_messages.find().sort("created_at", -1).skip(offset).limit(limit).to_list(limit)
-        return [ContactMessage(**msg) for msg in messages]
+        query = {}
+        if after:
+            created_at, message_id = pagination.decode_cursor(after)
+            try:
+                message_id = ObjectId(message_id)
+            except InvalidId:
+                raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+            query.update(pagination.after_filter(created_at, message_id, "_id"))
+
+        cursor = db.contact_messages.find(query, message_rows.projection).sort([("created_at", -1), ("_id", -1)])
+        if offset and not after:
+            cursor = cursor.skip(offset)
+        messages = await cursor.limit(limit).to_list(limit)
+
+        headers = {}
+        next_cursor = pagination.next_cursor(messages, limit, "_id")
+        if next_cursor:
+            headers[pagination.NEXT_CURSOR_HEADER] = next_cursor
+        rows = message_rows.rows(messages)
+        for row in rows:
+            row["id"] = str(row.pop("_id"))
+        return ORJSONResponse(rows, headers=headers)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching contact messages: {str(e)}")
-        raise HTTPException(status_code=500, detail="Failed to fetch messages")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to fetch messages")
+
+@router.post("/messages/{message_id}/read", response_model=ContactMessage, dependencies=[Depends(admin.require_admin)])
+async def mark_message_read(message_id: str):
+    """Mark a contact message read, so the archive job can move it once it is old (admin)"""
+    try:
+        try:
+            object_id = ObjectId(message_id)
+        except InvalidId:
+            raise HTTPException(status_code=404, detail="Message not found")
+
+        message = await db.contact_messages.find_one_and_update(
+            {"_id": object_id},
+            {"$set": {"is_read": True}},
+            projection=message_rows.projection,
+            return_document=ReturnDocument.AFTER
+        )
+        if message is None:
+            raise HTTPException(status_code=404, detail="Message not found")
+        del message["_id"]
+        return ORJSONResponse(message_rows.row(message))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error marking contact message read: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to update message")
+
+@router.get("/export", dependencies=[Depends(admin.require_admin)])
+async def export_contact_messages(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    is_read: Optional[bool] = None,
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    batch_size: int = Query(export.DEFAULT_BATCH_SIZE, ge=1, le=export.MAX_BATCH_SIZE),
+    gzip: bool = False
+):
+    """Stream contact messages, live and archived, oldest first, as NDJSON or CSV"""
+    query = export.created_at_filter(start, end)
+    if is_read is not None:
+        query["is_read"] = is_read
+    documents = archive.merged(db, "contact_messages", query, message_rows.projection, ("created_at", "_id"), batch_size)
+    return export.export_response(documents, message_rows, fmt, "contact-messages", gzip=gzip)
\ No newline at end of file
@@ -1,7 +1,11 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from typing import List, Optional
-from models.menu_item import MenuItem, MenuItemCreate
+from models.menu_item import MenuItem, MenuItemCreate, MenuItemSelector, MenuBulkUpdate
+from pymongo import UpdateMany, UpdateOne
+from datetime import datetime
+from utils import admin, http_cache, menu_cache, menu_search
+from utils.fast_json import ORJSONResponse
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,60 +16,110 @@ def set_db(database: AsyncIOMotorDatabase):
     db = database
 
 @router.get("/categories")
-async def get_menu_categories():
+async def get_menu_categories(request: Request):
     """Get all menu items grouped by category"""
     try:
-        menu_items = await db.menu_items.find({"is_available": True}, {"_id": 0}).to_list(1000)
-        
-        # Group items by category
-        categories = {}
-        for item in menu_items:
-            category = item.get("category")
-            if category not in categories:
-                categories[category] = {
-                    "id": len(categories) + 1,
-                    "name": category,
-                    "items": []
-                }
-            
-            categories[category]["items"].append({
-                "id": item["item_id"],
-                "name": item["name"],
-                "description": item["description"],
-                "price": item["price"],
-                "isVeg": item["is_veg"],
-                "image": item["image"]
-            })
-        
-        return list(categories.values())
+        snapshot = await menu_cache.get_snapshot(db)
+        return http_cache.respond(request, snapshot.categories_body())
     except Exception as e:
         logger.error(f"Error fetching menu categories: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch menu")
 
 @router.get("/items")
-async def get_menu_items(category: Optional[str] = None):
+async def get_menu_items(request: Request, category: Optional[str] = None):
     """Get all menu items, optionally filtered by category"""
     try:
-        query = {"is_available": True}
-        if category:
-            query["category"] = category
-        
-        items = await db.menu_items.find(query, {"_id": 0}).to_list(1000)
-        return [{**item, "id": item["item_id"]} for item in items]
+        snapshot = await menu_cache.get_snapshot(db)
+        return http_cache.respond(request, snapshot.items_body(category or None))
     except Exception as e:
         logger.error(f"Error fetching menu items: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch menu items")
 
+@router.get("/search")
+async def search_menu(q: str = Query(..., min_length=1, max_length=100), limit: int = Query(20, ge=1, le=100)):
+    """Search available items by name, description and category.
+
+    Matching tolerates common misspellings and transliterations ("tandori",
+    "afgani", "मोमो"); the last word also matches as a prefix.
+    """
+    try:
+        snapshot = await menu_cache.get_snapshot(db)
+        return ORJSONResponse(menu_search.for_snapshot(snapshot).search(q, limit))
+    except Exception as e:
+        logger.error(f"Error searching menu: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to search menu")
+
 @router.get("/item/{item_id}")
 async def get_menu_item(item_id: int):
     """Get single menu item by ID"""
     try:
-        item = await db.menu_items.find_one({"item_id": item_id}, {"_id": 0})
+        snapshot = await menu_cache.get_snapshot(db)
+        item = snapshot.get_item(item_id)
         if not item:
             raise HTTPException(status_code=404, detail="Item not found")
-        return {**item, "id": item["item_id"]}
+        return item
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error fetching menu item: {str(e)}")
-        raise HTTPException(status_code=500, detail="Failed to fetch menu item")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to fetch menu item")
+
+def selector_filter(selector: MenuItemSelector):
+    clauses = []
+    if selector.item_ids:
+        clauses.append({"item_id": {"$in": selector.item_ids}})
+    if selector.category:
+        clauses.append({"category": selector.category})
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+@router.post("/admin/bulk", dependencies=[Depends(admin.require_admin)])
+async def bulk_update_menu(update: MenuBulkUpdate):
+    """Apply item upserts, availability toggles and price changes in one write.
+
+    Operations run in order (upserts, then availability, then prices) as a
+    single ordered ``bulk_write``. A ``delta`` never takes a price below 1;
+    items it would do that to are left unchanged. The menu version is bumped
+    and this worker's snapshot reloaded before returning; other workers pick
+    the change up on their next revalidation. Requires the
+    ``X-Admin-Token`` header.
+    """
+    try:
+        now = datetime.utcnow()
+        requests = []
+        for item in update.upserts:
+            requests.append(UpdateOne(
+                {"item_id": item.item_id},
+                {"$set": {**item.dict(), "updated_at": now}, "$setOnInsert": {"created_at": now}},
+                upsert=True
+            ))
+        for change in update.availability:
+            requests.append(UpdateMany(
+                selector_filter(change),
+                {"$set": {"is_available": change.is_available, "updated_at": now}}
+            ))
+        for change in update.prices:
+            query = selector_filter(change)
+            if change.price is not None:
+                requests.append(UpdateMany(query, {"$set": {"price": change.price, "updated_at": now}}))
+            else:
+                if change.delta < 0:
+                    query = {"$and": [query, {"price": {"$gt": -change.delta}}]}
+                requests.append(UpdateMany(query, {"$inc": {"price": change.delta}, "$set": {"updated_at": now}}))
+        if not requests:
+            raise HTTPException(status_code=422, detail="Nothing to update")
+
+        result = await db.menu_items.bulk_write(requests, ordered=True)
+        await menu_cache.bump_version(db)
+        snapshot = await menu_cache.load(db)
+        logger.info(f"Menu bulk update: {len(requests)} operations, {result.modified_count} modified, {result.upserted_count} inserted")
+        return {
+            "matched": result.matched_count,
+            "modified": result.modified_count,
+            "upserted": result.upserted_count,
+            "version": snapshot.version[0]
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error applying menu bulk update: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to update menu")
\ No newline at end of file
@@ -1,51 +1,377 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from typing import List, Optional
-from models.order import Order, OrderCreate, OrderItem
+from typing import List, Literal, Optional
+from models.order import Order, OrderCreate, OrderItem, OrderQuoteRequest, OrderStatusUpdate, ORDER_STATUS_TRANSITIONS
+from utils import admin, archive, export, idempotency, menu_cache, metrics, pagination, pricing, rate_limit, rollups
+from utils.order_events import hub, format_event, TERMINAL_STATUSES
+from utils.kitchen_queue import kitchen, SUMMARY_PROJECTION as KITCHEN_PROJECTION
+from datetime import date, datetime
+from pymongo.errors import DuplicateKeyError
+from utils.ids import new_order_id
+from utils.fast_json import ORJSONResponse, TrustedRows
+from utils.group_commit import GroupCommitter, ENABLED as GROUP_COMMIT_ENABLED
+import asyncio
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/orders", tags=["orders"])
 
+# Attempts at a unique order_id before giving up (see utils.ids)
+ORDER_ID_ATTEMPTS = 3
+EVENTS_HEARTBEAT_SECONDS = float(os.environ.get("ORDER_EVENTS_HEARTBEAT_SECONDS", "15"))
+STATUS_FIELDS = {"_id": 0, "order_status": 1, "payment_status": 1, "updated_at": 1}
+# Id of the last event on a finished order's stream; resuming from it gets a 204
+END_EVENT_ID = "end"
+
+# Orders read back from Mongo were validated on insert; serve them without re-validation
+order_rows = TrustedRows(Order)
+
+# Concurrent order inserts are batched into one insert_many (see utils.group_commit)
+order_writer = None
+
 def set_db(database: AsyncIOMotorDatabase):
-    global db
+    global db, order_writer
     db = database
+    order_writer = GroupCommitter(db.orders) if GROUP_COMMIT_ENABLED else None
+
+def _group_commit_stats():
+    return order_writer.stats() if order_writer is not None else {}
+
+metrics.register_gauge("order_group_commit_batches", "Order group-commit batches written", (),
+                       lambda: {(): _group_commit_stats().get("batches", 0)})
+metrics.register_gauge("order_group_commit_documents", "Orders written through group commit", (),
+                       lambda: {(): _group_commit_stats().get("documents", 0)})
+
+metrics.register_gauge("kitchen_queue_orders", "Active orders in the in-memory kitchen queue", ("status",),
+                       lambda: {(status,): count for status, count in kitchen.counts().items()})
+metrics.register_gauge("order_event_subscribers", "Open order event streams", (),
+                       lambda: {(): hub.subscriber_count()})
+
+async def insert_order(document):
+    if order_writer is None:
+        await db.orders.insert_one(document)
+    else:
+        await order_writer.insert(document)
+
+async def price_items(order_items):
+    """Resolve names and prices from the menu and reject unknown or unavailable items"""
+    menu_items = await menu_cache.lookup_items(db, [item.item_id for item in order_items])
+    try:
+        return pricing.build_lines(menu_items, order_items)
+    except pricing.CartError as e:
+        raise HTTPException(status_code=422, detail=e.detail)
+
+@router.post("", response_model=Order, dependencies=[Depends(rate_limit.per_ip("orders"))])
+async def create_order(
+    order_input: OrderCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255)
+):
+    """Create a new order, once per ``Idempotency-Key`` (see utils.idempotency)"""
+    if not idempotency_key:
+        await rate_limit.enforce("orders", "phone", order_input.customer_phone)
+        return await place_order(order_input)
+
+    key = f"orders:{idempotency_key}"
+    request_fingerprint = idempotency.fingerprint(order_input.model_dump_json())
+    try:
+        # Only a request that actually places the order uses the phone budget,
+        # so look for a replay before charging it and claiming the key
+        result = await idempotency.store.lookup(db, key, request_fingerprint)
+        replayed = result is not None
+        if not replayed:
+            await rate_limit.enforce("orders", "phone", order_input.customer_phone)
+            result, replayed = await idempotency.store.run(
+                db, key, request_fingerprint,
+                lambda: place_order(order_input, as_document=True)
+            )
+    except idempotency.IdempotencyConflict:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different order")
+    except idempotency.IdempotencyInProgress:
+        raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still being processed",
+                            headers={"Retry-After": "1"})
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
 
-@router.post("", response_model=Order)
-async def create_order(order_input: OrderCreate):
-    """Create a new order"""
+async def place_order(order_input: OrderCreate, as_document: bool = False):
+    """Price, store and announce an order; returns the Order (or its stored document)"""
     try:
-        # Calculate totals
-        subtotal = sum(item.price * item.quantity for item in order_input.items)
-        delivery_charge = 30 if order_input.delivery_type == "delivery" else 0
-        total = subtotal + delivery_charge
+        lines = await price_items(order_input.items)
+
+        # Calculate totals with the same rules as POST /api/orders/quote
+        try:
+            totals = pricing.table.quote(lines, order_input.delivery_type, order_input.promo_code)
+        except pricing.CartError as e:
+            raise HTTPException(status_code=422, detail=e.detail)
         
         # Create order object
-        order_dict = order_input.dict()
+        order_dict = order_input.dict(exclude={"items"})
         order = Order(
             **order_dict,
-            subtotal=subtotal,
-            delivery_charge=delivery_charge,
-            total=total
+            items=[OrderItem(**line) for line in lines],
+            subtotal=totals["subtotal"],
+            discount=totals["discount"],
+            delivery_charge=totals["delivery_charge"],
+            tax=totals["tax"],
+            total=totals["total"]
         )
         
         # Insert into database
-        result = await db.orders.insert_one(order.dict())
+        document = order.dict()
+        for attempt in range(1, ORDER_ID_ATTEMPTS + 1):
+            try:
+                await insert_order(document)
+                break
+            except DuplicateKeyError:
+                # order_id is the only unique key on orders; two workers without
+                # ORDER_ID_WORKER can share a worker number, so draw a new id
+                if attempt == ORDER_ID_ATTEMPTS:
+                    raise
+                logger.warning(f"Duplicate order_id {order.order_id}, retrying with a new id")
+                order.order_id = document["order_id"] = new_order_id()
         
+        kitchen.upsert(document)
+        rollups.record_created(db, document)
+        hub.publish(order.order_id, "order_status", {
+            "order_status": order.order_status,
+            "payment_status": order.payment_status,
+            "updated_at": order.updated_at
+        })
         logger.info(f"Order created: {order.order_id}")
-        return order
+        return document if as_document else order
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error creating order: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to create order")
 
+@router.post("/quote")
+async def quote_orders(request: OrderQuoteRequest):
+    """Price up to 20 carts for checkout without placing orders.
+
+    Prices come from the in-memory menu snapshot and pricing table. The
+    snapshot is revalidated on the same schedule order creation uses (a
+    version check at most every ``MENU_CACHE_REVALIDATE_SECONDS``, a reload
+    when the menu changed), so a quote matches what the order is charged.
+    Each cart gets either its line items and totals or an ``error`` with the
+    same body a failed order would return.
+    """
+    if menu_cache.peek() is None:
+        raise HTTPException(status_code=503, detail="Menu is not loaded yet, please retry", headers={"Retry-After": "1"})
+    try:
+        snapshot = await menu_cache.get_snapshot(db)
+    except Exception as e:
+        # Quoting from the last good snapshot beats failing checkout outright
+        logger.error(f"Error revalidating menu for quote: {str(e)}")
+        snapshot = menu_cache.peek()
+
+    quotes = []
+    for cart in request.carts:
+        try:
+            lines = pricing.build_lines(snapshot.items_by_id, cart.items)
+            totals = pricing.table.quote(lines, cart.delivery_type, cart.promo_code)
+        except pricing.CartError as e:
+            quotes.append({"error": e.detail})
+            continue
+        quotes.append({
+            "items": [{key: line[key] for key in ("item_id", "name", "price", "quantity")} for line in lines],
+            **totals
+        })
+    return ORJSONResponse({"quotes": quotes})
+
+SUMMARY_FIELDS = ("order_id", "customer_name", "total", "order_status", "created_at")
+# Every field is in the status_created_at / created_at indexes, so no documents are fetched
+SUMMARY_PROJECTION = {"_id": 0, **{field: 1 for field in SUMMARY_FIELDS}}
+
+@router.get("/summary", dependencies=[Depends(admin.require_admin)])
+async def get_order_summaries(
+    status: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    after: Optional[str] = None
+):
+    """Compact order rows for the admin dashboard.
+
+    Returns ``{"fields": [...], "rows": [[...], ...]}`` with one array per
+    order, newest first, paged with the same ``X-Next-Cursor``/``after``
+    cursor as ``GET /api/orders``.
+    """
+    try:
+        query = {}
+        if status:
+            query["order_status"] = status
+        if after:
+            created_at, order_id = pagination.decode_cursor(after)
+            query.update(pagination.after_filter(created_at, order_id, "order_id"))
+
+        cursor = db.orders.find(query, SUMMARY_PROJECTION).sort([("created_at", -1), ("order_id", -1)])
+        orders = await cursor.limit(limit).to_list(limit)
+
+        headers = {}
+        next_cursor = pagination.next_cursor(orders, limit, "order_id")
+        if next_cursor:
+            headers[pagination.NEXT_CURSOR_HEADER] = next_cursor
+        return ORJSONResponse(
+            {"fields": SUMMARY_FIELDS, "rows": [[order.get(field) for field in SUMMARY_FIELDS] for order in orders]},
+            headers=headers
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching order summaries: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch order summaries")
+
+@router.get("/export", dependencies=[Depends(admin.require_admin)])
+async def export_orders(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    status: Optional[str] = None,
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    batch_size: int = Query(export.DEFAULT_BATCH_SIZE, ge=1, le=export.MAX_BATCH_SIZE),
+    gzip: bool = False
+):
+    """Stream every matching order, live and archived, oldest first, as NDJSON or CSV.
+
+    ``start``/``end`` are inclusive UTC dates on ``created_at``. Rows are
+    read from cursors in ``batch_size`` batches and written as they arrive,
+    so the export size is not limited by memory.
+    """
+    query = export.created_at_filter(start, end)
+    if status:
+        query["order_status"] = status
+    documents = archive.merged(db, "orders", query, order_rows.projection, ("created_at", "order_id"), batch_size)
+    return export.export_response(documents, order_rows, fmt, "orders", gzip=gzip)
+
+@router.get("/kitchen", dependencies=[Depends(admin.require_admin)])
+async def get_kitchen_queue():
+    """Active orders grouped by status, oldest first, served from memory"""
+    return ORJSONResponse(kitchen.active())
+
+@router.patch("/{order_id}/status", dependencies=[Depends(admin.require_admin)])
+async def update_order_status(order_id: str, update: OrderStatusUpdate):
+    """Move an order along its lifecycle and/or set its payment status (admin)"""
+    try:
+        if update.order_status is None and update.payment_status is None:
+            raise HTTPException(status_code=422, detail="Nothing to update")
+
+        current = await db.orders.find_one({"order_id": order_id}, KITCHEN_PROJECTION)
+        if not current:
+            raise HTTPException(status_code=404, detail="Order not found")
+
+        changes = {}
+        if update.order_status is not None and update.order_status != current["order_status"]:
+            allowed = ORDER_STATUS_TRANSITIONS.get(current["order_status"], ())
+            if update.order_status not in allowed:
+                raise HTTPException(status_code=409, detail={
+                    "message": f"Cannot move order from {current['order_status']} to {update.order_status}",
+                    "allowed": list(allowed)
+                })
+            changes["order_status"] = update.order_status
+        if update.payment_status is not None and update.payment_status != current.get("payment_status"):
+            changes["payment_status"] = update.payment_status
+        if not changes:
+            return ORJSONResponse({"order_id": order_id, **{key: current.get(key) for key in ("order_status", "payment_status")}})
+
+        now = datetime.utcnow()
+        # Conditional on the status read above, so of two concurrent updates only one applies
+        result = await db.orders.update_one(
+            {
+                "order_id": order_id,
+                "order_status": current["order_status"],
+                "payment_status": current.get("payment_status")
+            },
+            {"$set": {**changes, "updated_at": now}}
+        )
+        if result.matched_count == 0:
+            raise HTTPException(status_code=409, detail="Order was updated concurrently, reload and retry")
+
+        kitchen.update(order_id, changes)
+        rollups.record_transition(db, current, changes)
+        for field, value in changes.items():
+            hub.publish(order_id, field, {field: value, "updated_at": now})
+        logger.info(f"Order {order_id} updated: {changes}")
+
+        state = {**current, **changes, "updated_at": now}
+        return ORJSONResponse({key: state.get(key) for key in ("order_id", "order_status", "payment_status", "updated_at")})
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error updating order status: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to update order status")
+
+@router.get("/{order_id}/events")
+async def stream_order_events(order_id: str, request: Request, last_event_id: Optional[str] = None):
+    """Server-Sent Events stream of an order's status changes (see utils.order_events)"""
+    resume_from = request.headers.get("last-event-id") or last_event_id
+    if resume_from == END_EVENT_ID:
+        # Finished orders never change again; answer without touching the hub or Mongo
+        return Response(status_code=204)
+
+    try:
+        if hub.state(order_id) is None:
+            order = await db.orders.find_one({"order_id": order_id}, STATUS_FIELDS)
+            if not order:
+                order = await db[archive.ORDERS_ARCHIVE].find_one({"order_id": order_id}, STATUS_FIELDS)
+            if not order:
+                raise HTTPException(status_code=404, detail="Order not found")
+            hub.prime(order_id, order)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error opening order event stream: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to open order event stream")
+
+    async def events():
+        queue = hub.subscribe(order_id)
+        try:
+            # Reconnect quickly; the resume token covers anything missed meanwhile
+            yield "retry: 3000\n\n"
+            seq, state = hub.state(order_id)
+            missed = None
+            if resume_from is not None and resume_from.isdigit():
+                missed = hub.events_since(order_id, int(resume_from))
+            if missed is None:
+                yield format_event(seq, "snapshot", {"order_id": order_id, **state})
+                last_sent = seq
+            else:
+                for event in missed:
+                    yield format_event(*event)
+                last_sent = seq
+
+            while state.get("order_status") not in TERMINAL_STATUSES:
+                try:
+                    event = await asyncio.wait_for(queue.get(), EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                if event[0] <= last_sent:
+                    continue
+                last_sent = event[0]
+                state.update(event[2])
+                yield format_event(*event)
+            yield format_event(END_EVENT_ID, "end", {"order_id": order_id, "order_status": state.get("order_status")})
+        finally:
+            hub.unsubscribe(order_id, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/{order_id}", response_model=Order)
 async def get_order(order_id: str):
     """Get order by ID"""
     try:
-        order = await db.orders.find_one({"order_id": order_id})
+        order = await db.orders.find_one({"order_id": order_id}, order_rows.projection)
+        if not order:
+            # Completed orders move to the archive after a while
+            order = await db[archive.ORDERS_ARCHIVE].find_one({"order_id": order_id}, order_rows.projection)
         if not order:
             raise HTTPException(status_code=404, detail="Order not found")
-        return Order(**order)
+        return ORJSONResponse(order_rows.row(order))
     except HTTPException:
         raise
     except Exception as e:
@@ -53,15 +379,38 @@ async def get_order(order_id: str):
         raise HTTPException(status_code=500, detail="Failed to fetch order")
 
 @router.get("", response_model=List[Order])
-async def get_orders(status: Optional[str] = None, limit: int = 50, offset: int = 0):
-    """Get all orders with optional filtering"""
+async def get_orders(
+    status: Optional[str] = None,
+    limit: int = 50,
+    after: Optional[str] = None,
+    offset: int = Query(0, deprecated=True)
+):
+    """Get all orders with optional filtering.
+
+    Pages are newest first; pass the ``X-Next-Cursor`` header of one page as
+    ``after`` to fetch the next. ``offset`` still works but scans every
+    skipped order.
+    """
     try:
         query = {}
         if status:
             query["order_status"] = status
+        if after:
+            created_at, order_id = pagination.decode_cursor(after)
+            query.update(pagination.after_filter(created_at, order_id, "order_id"))
         
-        orders = await db.orders.find(query).sort("created_at", -1).skip(offset).limit(limit).to_list(limit)
-        return [Order(**order) for order in orders]
+        cursor = db.orders.find(query, order_rows.projection).sort([("created_at", -1), ("order_id", -1)])
+        if offset and not after:
+            cursor = cursor.skip(offset)
+        orders = await cursor.limit(limit).to_list(limit)
+
+        headers = {}
+        next_cursor = pagination.next_cursor(orders, limit, "order_id")
+        if next_cursor:
+            headers[pagination.NEXT_CURSOR_HEADER] = next_cursor
+        return ORJSONResponse(order_rows.rows(orders), headers=headers)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching orders: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch orders")
\ No newline at end of file
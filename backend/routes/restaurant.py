@@ -1,30 +1,55 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Request
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from utils import http_cache, ratings
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/restaurant", tags=["restaurant"])
 
+RESTAURANT_INFO = {
+    "name": "दिल्ली तंदूरी मोमो",
+    "englishName": "Delhi Tandoori Momo",
+    "tagline": "Authentic Delhi-Style Tandoori Momos in Bhagalpur",
+    # rating and totalReviews are filled in from the approved-review aggregate
+    "rating": None,
+    "totalReviews": 0,
+    "priceRange": "₹1–200 per person",
+    "phone": "8873652662",
+    "businessPhone": "079790 16236",
+    "address": "Zila School Rd, Adampur, Bhagalpur, Bihar – 812001",
+    "location": "Nagarmal Sheonarain and Sons, Bhagalpur",
+    "plusCode": "7X2H+44 Bhagalpur, Bihar",
+    "timings": "Open daily, closes at 10:30 PM",
+    "services": ["Dine-in", "Takeaway", "Delivery", "Online Ordering"],
+    "socialMedia": {
+        "whatsapp": "8873652662",
+        "instagram": "rishijha390",
+        "facebook": "#"
+    },
+    "mapEmbedUrl": "https://www.google.com/maps/embed?pb=!1m18!1m12!1m3!1d3610.8!2d87.32!3d25.25!2m3!1f0!2f0!3f0!3m2!1i1024!2i768!4f13.1!3m3!1m2!1s0x0%3A0x0!2zMjXCsDE1JzAwLjAiTiA4N8KwMTknMTIuMCJF!5e0!3m2!1sen!2sin!4v1234567890"
+}
+
+# Re-encoded only when the rating aggregate changes
+_info_body = None
+_info_version = None
+
+def set_db(database: AsyncIOMotorDatabase):
+    global db
+    db = database
+
 @router.get("/info")
-async def get_restaurant_info():
+async def get_restaurant_info(request: Request):
     """Get restaurant information"""
-    return {
-        "name": "दिल्ली तंदूरी मोमो",
-        "englishName": "Delhi Tandoori Momo",
-        "tagline": "Authentic Delhi-Style Tandoori Momos in Bhagalpur",
-        "rating": 4.5,
-        "totalReviews": 104,
-        "priceRange": "₹1–200 per person",
-        "phone": "8873652662",
-        "businessPhone": "079790 16236",
-        "address": "Zila School Rd, Adampur, Bhagalpur, Bihar – 812001",
-        "location": "Nagarmal Sheonarain and Sons, Bhagalpur",
-        "plusCode": "7X2H+44 Bhagalpur, Bihar",
-        "timings": "Open daily, closes at 10:30 PM",
-        "services": ["Dine-in", "Takeaway", "Delivery", "Online Ordering"],
-        "socialMedia": {
-            "whatsapp": "8873652662",
-            "instagram": "rishijha390",
-            "facebook": "#"
-        },
-        "mapEmbedUrl": "https://www.google.com/maps/embed?pb=!1m18!1m12!1m3!1d3610.8!2d87.32!3d25.25!2m3!1f0!2f0!3f0!3m2!1i1024!2i768!4f13.1!3m3!1m2!1s0x0%3A0x0!2zMjXCsDE1JzAwLjAiTiA4N8KwMTknMTIuMCJF!5e0!3m2!1sen!2sin!4v1234567890"
-    }
\ No newline at end of file
+    global _info_body, _info_version
+    try:
+        stats = await ratings.get(db)
+        if _info_version != ratings.version:
+            _info_body = http_cache.CachedBody(
+                {**RESTAURANT_INFO, "rating": stats["average"], "totalReviews": stats["count"]},
+                max_age=60
+            )
+            _info_version = ratings.version
+        return http_cache.respond(request, _info_body)
+    except Exception as e:
+        logger.error(f"Error fetching restaurant info: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch restaurant info")
\ No newline at end of file
@@ -1,28 +1,53 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from typing import List
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
 from models.review import Review, ReviewCreate
+from utils import admin, http_cache, rate_limit, ratings, write_behind
+from utils.fast_json import ORJSONResponse, TrustedRows
 from datetime import datetime
 import logging
+import os
+import time
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/reviews", tags=["reviews"])
 
+# Approved reviews change rarely (approval happens out of band), so the
+# encoded list is kept for a short TTL per requested limit
+REVIEWS_CACHE_TTL = float(os.environ.get("REVIEWS_CACHE_TTL", "60"))
+REVIEWS_CACHE_MAX_KEYS = 32
+_reviews_cache = {}
+review_rows = TrustedRows(Review)
+# _id is returned as "id" so moderators can approve a pending review
+pending_rows = TrustedRows(Review, extra_fields=("_id",))
+
 def set_db(database: AsyncIOMotorDatabase):
     global db
     db = database
 
+def invalidate_reviews_cache():
+    _reviews_cache.clear()
+
 @router.get("", response_model=List[Review])
-async def get_reviews(limit: int = 10):
+async def get_reviews(request: Request, limit: int = 10):
     """Get approved reviews"""
     try:
-        reviews = await db.reviews.find({"is_approved": True}).sort("created_at", -1).limit(limit).to_list(limit)
-        return [Review(**review) for review in reviews]
+        cached = _reviews_cache.get(limit)
+        if cached is None or cached[1] < time.monotonic():
+            reviews = await db.reviews.find({"is_approved": True}, review_rows.projection).sort("created_at", -1).limit(limit).to_list(limit)
+            body = http_cache.CachedBody(review_rows.rows(reviews), max_age=int(REVIEWS_CACHE_TTL))
+            if len(_reviews_cache) >= REVIEWS_CACHE_MAX_KEYS:
+                _reviews_cache.clear()
+            cached = _reviews_cache[limit] = (body, time.monotonic() + REVIEWS_CACHE_TTL)
+        return http_cache.respond(request, cached[0])
     except Exception as e:
         logger.error(f"Error fetching reviews: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch reviews")
 
-@router.post("", response_model=Review)
+@router.post("", response_model=Review, dependencies=[Depends(rate_limit.per_ip("reviews"))])
 async def create_review(review_input: ReviewCreate):
     """Submit a new review"""
     try:
@@ -40,10 +65,68 @@ async def create_review(review_input: ReviewCreate):
             is_approved=False  # Reviews need approval
         )
         
-        await db.reviews.insert_one(review.dict())
+        await write_behind.insert(db, "reviews", review.dict())
         logger.info(f"Review submitted by {review.name}")
         
         return review
+    except write_behind.WriteBehindFull:
+        raise HTTPException(status_code=503, detail="Server is busy, please retry", headers={"Retry-After": "1"})
     except Exception as e:
         logger.error(f"Error creating review: {str(e)}")
-        raise HTTPException(status_code=500, detail="Failed to submit review")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to submit review")
+
+@router.get("/stats")
+async def get_review_stats():
+    """Average rating, count and per-star histogram of approved reviews"""
+    try:
+        return ORJSONResponse(await ratings.get(db))
+    except Exception as e:
+        logger.error(f"Error fetching review stats: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch review stats")
+
+@router.get("/pending", dependencies=[Depends(admin.require_admin)])
+async def get_pending_reviews(limit: int = Query(50, ge=1, le=500)):
+    """Reviews awaiting approval, oldest first (admin, needs ``X-Admin-Token``)"""
+    try:
+        reviews = await db.reviews.find({"is_approved": False}, pending_rows.projection).sort("created_at", 1).limit(limit).to_list(limit)
+        rows = pending_rows.rows(reviews)
+        for row in rows:
+            row["id"] = str(row.pop("_id"))
+        return ORJSONResponse(rows)
+    except Exception as e:
+        logger.error(f"Error fetching pending reviews: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch pending reviews")
+
+@router.post("/{review_id}/approve", response_model=Review, dependencies=[Depends(admin.require_admin)])
+async def approve_review(review_id: str):
+    """Approve a pending review and count it in the rating aggregate (admin)"""
+    try:
+        try:
+            object_id = ObjectId(review_id)
+        except InvalidId:
+            raise HTTPException(status_code=404, detail="Review not found")
+
+        # Build a missing aggregate before the flip, so the rebuild cannot include this review
+        await ratings.ensure(db)
+        review = await db.reviews.find_one_and_update(
+            {"_id": object_id, "is_approved": False},
+            {"$set": {"is_approved": True}},
+            projection=pending_rows.projection,
+            return_document=ReturnDocument.AFTER
+        )
+        if review is None:
+            review = await db.reviews.find_one({"_id": object_id}, pending_rows.projection)
+            if review is None:
+                raise HTTPException(status_code=404, detail="Review not found")
+        else:
+            invalidate_reviews_cache()
+            logger.info(f"Review {review_id} approved")
+        # Also finishes a count left unfinished by an earlier failed approval
+        await ratings.count_approved(db)
+        del review["_id"]
+        return ORJSONResponse(review_rows.row(review))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error approving review: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to approve review")
\ No newline at end of file
@@ -2,17 +2,20 @@ from fastapi import FastAPI, APIRouter
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+import inspect
 import os
 import logging
 from pathlib import Path
 
-# Import routes
-from routes import menu, orders, reviews, contact, restaurant
-from utils.seed_data import seed_database
-
+# Load .env before importing modules that read their settings at import time
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# Import routes
+from routes import menu, orders, reviews, contact, restaurant, analytics, metrics as metrics_routes
+from utils.seed_data import seed_database
+from utils import archive, compression, indexes, kitchen_queue, menu_cache, metrics, ratings, rollups, write_behind
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -24,7 +27,10 @@ logger = logging.getLogger(__name__)
 mongo_url = os.environ.get("MONGO_URL")
 if not mongo_url:
     raise RuntimeError("MONGO_URL environment variable is not set")
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(
+    mongo_url,
+    event_listeners=[metrics.MongoCommandListener(), metrics.MongoPoolListener()]
+)
 db = client[os.environ.get('DB_NAME', 'restaurant_db')]
 
 # Create the main app without a prefix
@@ -39,10 +45,18 @@ async def root():
     return {"message": "Delhi Tandoori Momo API is running!", "status": "healthy"}
 
 # Set database for all route modules
-menu.set_db(db)
-orders.set_db(db)
-reviews.set_db(db)
-contact.set_db(db)
+def set_db(database):
+    """Point the app and every route module at ``database`` (benchmarks swap in their own)"""
+    global db
+    db = database
+    menu.set_db(db)
+    orders.set_db(db)
+    reviews.set_db(db)
+    contact.set_db(db)
+    restaurant.set_db(db)
+    analytics.set_db(db)
+
+set_db(db)
 
 # Include all routers
 api_router.include_router(menu.router)
@@ -50,6 +64,8 @@ api_router.include_router(orders.router)
 api_router.include_router(reviews.router)
 api_router.include_router(contact.router)
 api_router.include_router(restaurant.router)
+api_router.include_router(analytics.router)
+api_router.include_router(metrics_routes.router)
 
 # Include the API router in the main app
 app.include_router(api_router)
@@ -61,26 +77,52 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Idempotent-Replayed", "Retry-After", "Content-Disposition"],
+)
+
+# gzip/brotli for clients that accept it; cached bodies arrive pre-compressed
+app.add_middleware(compression.CompressionMiddleware)
+
+# Per-route request metrics, served at /api/metrics
+app.add_middleware(metrics.MetricsMiddleware)
+
+# Startup event - indexes, seed data and caches
+STARTUP_STEPS = (
+    ("indexes", lambda: indexes.ensure_indexes(db)),
+    # Reads one meta document; only applies changes when the seed set changed
+    ("seed data", lambda: seed_database(db)),
+    # Warm the in-process menu snapshot so the first requests skip Mongo
+    ("menu cache", lambda: menu_cache.load(db)),
+    # Rating aggregate behind /api/restaurant/info (built on first start)
+    ("ratings", lambda: ratings.get(db)),
+    ("index coverage report", lambda: indexes.report_index_coverage(db)),
+    ("kitchen queue", lambda: kitchen_queue.start(db)),
+    ("write-behind", lambda: write_behind.start(db)),
+    # Moves completed orders and read messages to archive collections, if enabled
+    ("archive", lambda: archive.start(db)),
 )
 
-# Startup event - seed database
 @app.on_event("startup")
 async def startup_event():
-    try:
-        logger.info("Starting up application...")
-
-        menu_count = await db.menu_items.count_documents({})
-        if menu_count == 0:
-            logger.info("Database is empty. Seeding data...")
-            await seed_database(db)
-        else:
-            logger.info(f"Database already has {menu_count} menu items")
-
-    except Exception as e:
-        logger.error(f"Startup DB error: {e}")
+    logger.info("Starting up application...")
+    # Steps are independent: one failing (e.g. seeding) must not leave the
+    # kitchen queue or background jobs unstarted for the life of the process
+    for name, step in STARTUP_STEPS:
+        try:
+            result = step()
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logger.error(f"Startup step '{name}' failed: {e}")
 
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
     logger.info("Shutting down application...")
+    await archive.stop()
+    await write_behind.stop()
+    await kitchen_queue.stop()
+    if orders.order_writer is not None:
+        await orders.order_writer.drain()
+    await rollups.drain()
     client.close()
\ No newline at end of file
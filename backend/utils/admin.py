@@ -0,0 +1,22 @@
+"""Shared-secret guard for staff-only endpoints.
+
+Routes that change the menu, moderate reviews or move orders along depend on
+``require_admin``, which compares the ``X-Admin-Token`` request header with
+the ``ADMIN_TOKEN`` environment variable. When ``ADMIN_TOKEN`` is not set the
+guarded endpoints are switched off (403) rather than left open.
+"""
+import hmac
+import os
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+
+async def require_admin(admin_token: Optional[str] = Header(None, alias="X-Admin-Token")):
+    """Route dependency rejecting requests without the admin token"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled")
+    if admin_token is None or not hmac.compare_digest(admin_token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
@@ -0,0 +1,179 @@
+"""Hot/cold tiering for orders and contact messages.
+
+Delivered and cancelled orders created more than ``ARCHIVE_ORDER_DAYS`` ago,
+and read contact messages older than ``ARCHIVE_MESSAGE_DAYS``, are moved into
+``orders_archive`` / ``contact_messages_archive`` so the live collections
+and their indexes only hold recent data. Each pass moves at most
+``ARCHIVE_MAX_BATCHES`` batches of ``ARCHIVE_BATCH_SIZE`` documents: a batch
+is copied with an unordered ``insert_many`` (copies left behind by an
+interrupted pass are skipped as duplicates) and then deleted from the live
+collection. The job runs every ``ARCHIVE_INTERVAL_SECONDS`` when that is set;
+``python -m utils.archive`` runs a single pass.
+
+With ``ARCHIVE_PARQUET_DIR`` set and ``pyarrow`` installed, each archived
+batch is also written there as a Parquet file.
+
+``merged`` reads a live collection and its archive as one stream in key
+order, dropping a document that is briefly present in both; exports and the
+rollup backfill use it so archived data stays visible to them.
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from pymongo.errors import BulkWriteError
+
+from utils import metrics
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # optional dependency
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+INTERVAL_SECONDS = float(os.environ.get("ARCHIVE_INTERVAL_SECONDS", "0"))
+ORDER_DAYS = int(os.environ.get("ARCHIVE_ORDER_DAYS", "30"))
+MESSAGE_DAYS = int(os.environ.get("ARCHIVE_MESSAGE_DAYS", "90"))
+BATCH_SIZE = int(os.environ.get("ARCHIVE_BATCH_SIZE", "500"))
+MAX_BATCHES = int(os.environ.get("ARCHIVE_MAX_BATCHES", "100"))
+PARQUET_DIR = os.environ.get("ARCHIVE_PARQUET_DIR")
+
+ORDERS_ARCHIVE = "orders_archive"
+MESSAGES_ARCHIVE = "contact_messages_archive"
+
+# collection -> (archive collection, filter for archivable documents given a cutoff, retention days)
+TIERS = {
+    "orders": (ORDERS_ARCHIVE, lambda cutoff: {"order_status": {"$in": ["delivered", "cancelled"]}, "created_at": {"$lt": cutoff}}, ORDER_DAYS),
+    # Unread messages stay in the inbox however old; POST /api/contact/messages/{id}/read marks them
+    "contact_messages": (MESSAGES_ARCHIVE, lambda cutoff: {"is_read": True, "created_at": {"$lt": cutoff}}, MESSAGE_DAYS),
+}
+
+moved = {name: 0 for name in TIERS}
+_task = None
+
+
+def _write_parquet(collection_name, documents):
+    directory = Path(PARQUET_DIR) / collection_name
+    directory.mkdir(parents=True, exist_ok=True)
+    rows = [{**document, "_id": str(document["_id"])} for document in documents]
+    path = directory / f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{rows[0]['_id']}.parquet"
+    pyarrow.parquet.write_table(pyarrow.Table.from_pylist(rows), path)
+
+
+async def archive_collection(db, collection_name, now=None):
+    """Move archivable documents of one collection in bounded batches; returns how many moved"""
+    archive_name, build_filter, days = TIERS[collection_name]
+    query = build_filter((now or datetime.utcnow()) - timedelta(days=days))
+    source, target = db[collection_name], db[archive_name]
+    total = 0
+    for _ in range(MAX_BATCHES):
+        documents = await source.find(query).sort("created_at", 1).limit(BATCH_SIZE).to_list(BATCH_SIZE)
+        if not documents:
+            break
+        try:
+            await target.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                raise
+        if PARQUET_DIR and pyarrow is not None:
+            try:
+                await asyncio.to_thread(_write_parquet, collection_name, documents)
+            except Exception as e:
+                logger.error(f"Failed to write Parquet export for {collection_name}: {str(e)}")
+        result = await source.delete_many({"_id": {"$in": [document["_id"] for document in documents]}, **query})
+        total += result.deleted_count
+        moved[collection_name] += result.deleted_count
+        if len(documents) < BATCH_SIZE:
+            break
+        # Let request handlers run between batches
+        await asyncio.sleep(0)
+    if total:
+        logger.info(f"Archived {total} documents from {collection_name} to {archive_name}")
+    return total
+
+
+async def run_once(db):
+    return {name: await archive_collection(db, name) for name in TIERS}
+
+
+async def merged(db, collection_name, query, projection, key_fields, batch_size=1000):
+    """Yield matching documents from a collection and its archive, ascending by ``key_fields``"""
+    archive_name = TIERS[collection_name][0]
+    sort = [(field, 1) for field in key_fields]
+    cursors = [
+        db[name].find(query, projection).sort(sort).batch_size(batch_size)
+        for name in (collection_name, archive_name)
+    ]
+    heads = {}
+    try:
+        for index, cursor in enumerate(cursors):
+            async for document in cursor:
+                heads[index] = document
+                break
+        last_key = None
+        while heads:
+            index = min(heads, key=lambda i: tuple(heads[i][field] for field in key_fields))
+            document = heads.pop(index)
+            key = tuple(document[field] for field in key_fields)
+            if key != last_key:
+                yield document
+                last_key = key
+            async for following in cursors[index]:
+                heads[index] = following
+                break
+    finally:
+        for cursor in cursors:
+            await cursor.close()
+
+
+async def _run_forever(db):
+    while True:
+        await asyncio.sleep(INTERVAL_SECONDS)
+        try:
+            await run_once(db)
+        except Exception as e:
+            logger.error(f"Archive pass failed: {str(e)}")
+
+
+def start(db):
+    global _task
+    if INTERVAL_SECONDS > 0:
+        _task = asyncio.create_task(_run_forever(db))
+        if PARQUET_DIR and pyarrow is None:
+            logger.warning("ARCHIVE_PARQUET_DIR is set but pyarrow is not installed; skipping Parquet exports")
+
+
+async def stop():
+    global _task
+    if _task is not None:
+        _task.cancel()
+        _task = None
+
+
+metrics.register_gauge(
+    "archive_documents_moved",
+    "Documents moved to archive collections by this worker",
+    ("collection",),
+    lambda: {(name,): count for name, count in moved.items()},
+)
+
+
+async def _main():
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent.parent / ".env")
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+    try:
+        print(await run_once(client[os.environ.get("DB_NAME", "restaurant_db")]))
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    asyncio.run(_main())
@@ -0,0 +1,91 @@
+"""Streaming NDJSON/CSV exports straight from Mongo cursors.
+
+Rows are read with a bounded cursor batch size, encoded, and flushed in
+chunks of roughly ``CHUNK_BYTES``, so memory use stays flat however many rows
+the export covers. With ``gzip`` the chunks go through one incremental
+``zlib`` stream and the response carries ``Content-Encoding: gzip``.
+"""
+import csv
+import io
+import os
+import zlib
+from datetime import date, datetime, time
+
+import orjson
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+DEFAULT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE", "1000"))
+MAX_BATCH_SIZE = 10000
+CHUNK_BYTES = 64 * 1024
+FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+}
+
+
+def created_at_filter(start, end):
+    """``created_at`` bounds for an inclusive date (or datetime) range"""
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    bounds = {}
+    if start:
+        bounds["$gte"] = start if isinstance(start, datetime) else datetime.combine(start, time.min)
+    if end:
+        bounds["$lte"] = end if isinstance(end, datetime) else datetime.combine(end, time.max)
+    return {"created_at": bounds} if bounds else {}
+
+
+def _csv_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (list, dict)):
+        return orjson.dumps(value).decode("utf-8")
+    return value
+
+
+async def _encode(documents, rows, fmt):
+    buffer = io.StringIO() if fmt == "csv" else bytearray()
+    writer = None
+    if fmt == "csv":
+        writer = csv.writer(buffer)
+        writer.writerow(rows.fields)
+    try:
+        async for document in documents:
+            row = rows.row(document)
+            if writer is not None:
+                writer.writerow([_csv_value(row.get(field)) for field in rows.fields])
+                if buffer.tell() >= CHUNK_BYTES:
+                    yield buffer.getvalue().encode("utf-8")
+                    buffer.seek(0)
+                    buffer.truncate()
+            else:
+                buffer += orjson.dumps({field: row.get(field) for field in rows.fields}, option=orjson.OPT_APPEND_NEWLINE)
+                if len(buffer) >= CHUNK_BYTES:
+                    yield bytes(buffer)
+                    buffer.clear()
+        tail = buffer.getvalue().encode("utf-8") if writer is not None else bytes(buffer)
+        if tail:
+            yield tail
+    finally:
+        await documents.aclose()
+
+
+async def _gzip(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_response(documents, rows, fmt, filename, gzip=False):
+    """Stream ``documents`` (an async generator) as ``fmt`` using ``rows`` (a ``TrustedRows``) for columns and defaults"""
+    media_type, extension = FORMATS[fmt]
+    body = _encode(documents, rows, fmt)
+    headers = {"Content-Disposition": f'attachment; filename="{filename}.{extension}"'}
+    if gzip:
+        body = _gzip(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type=media_type, headers=headers)
@@ -0,0 +1,42 @@
+"""Fast response path for documents read back from our own collections.
+
+Documents in ``orders``, ``reviews`` and ``contact_messages`` were validated
+by their Pydantic models on the way in, so list endpoints do not need to build
+a model per document and then have FastAPI validate and serialize it again
+through ``response_model``. ``TrustedRows`` supplies a Mongo projection that
+returns only the response fields and fills in missing defaults without
+validation; the rows go straight to orjson via ``ORJSONResponse``.
+"""
+from fastapi.responses import ORJSONResponse
+from pydantic_core import PydanticUndefined
+
+__all__ = ["ORJSONResponse", "TrustedRows"]
+
+
+class TrustedRows:
+    def __init__(self, model, extra_fields=()):
+        self.model = model
+        self.fields = tuple(model.model_fields)
+        # extra_fields are fetched for internal use (e.g. cursors) and popped by the caller
+        self.projection = {"_id": 0, **{name: 1 for name in self.fields}}
+        for name in extra_fields:
+            self.projection[name] = 1
+        self._defaults = {
+            name: field.default
+            for name, field in model.model_fields.items()
+            if field.default is not PydanticUndefined and field.default_factory is None
+        }
+
+    def row(self, document):
+        if all(name in document for name in self.fields):
+            return document
+        row = dict(document)
+        for name, value in self._defaults.items():
+            row.setdefault(name, value)
+        if not all(name in row for name in self.fields):
+            # Rare: an old document missing a factory-default field
+            row = {**self.model.model_construct(**document).__dict__, **document}
+        return row
+
+    def rows(self, documents):
+        return [self.row(document) for document in documents]
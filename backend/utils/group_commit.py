@@ -0,0 +1,120 @@
+"""Group commit for inserts that must report success or failure per caller.
+
+Concurrent callers of ``GroupCommitter.insert`` that arrive within
+``window_ms`` of each other (or until ``max_batch`` documents are waiting)
+are written with a single ordered ``insert_many``. Every caller awaits its own
+future and gets its own outcome: with an ordered write the documents before a
+failing one are committed, the failing caller gets the error (for example a
+``DuplicateKeyError``), and the documents after it are retried in the next
+round trip. A ``BulkWriteError`` carrying only ``writeConcernErrors`` means
+every document was written but not yet acknowledged by the requested write
+concern; those callers succeed and the error is logged.
+"""
+import asyncio
+import logging
+import os
+import time
+
+from pymongo.errors import BulkWriteError, DuplicateKeyError, WriteError
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get("ORDER_GROUP_COMMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+WINDOW_MS = float(os.environ.get("ORDER_GROUP_COMMIT_WINDOW_MS", "2"))
+MAX_BATCH = int(os.environ.get("ORDER_GROUP_COMMIT_MAX_BATCH", "64"))
+
+
+def _write_error(error):
+    """Turn one entry of BulkWriteError.details['writeErrors'] into an exception"""
+    if error.get("code") == 11000:
+        return DuplicateKeyError(error.get("errmsg"), error.get("code"), error)
+    return WriteError(error.get("errmsg"), error.get("code"), error)
+
+
+class GroupCommitter:
+    def __init__(self, collection, window_ms=WINDOW_MS, max_batch=MAX_BATCH):
+        self.collection = collection
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._pending = []
+        self._timer = None
+        self._inflight = set()
+
+        self.batches = 0
+        self.documents = 0
+        self.commit_seconds_total = 0.0
+
+    async def insert(self, document):
+        """Insert ``document`` as part of the next group commit"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((document, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._commit(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _commit(self, batch):
+        started = time.perf_counter()
+        self.batches += 1
+        self.documents += len(batch)
+        remaining = batch
+        while remaining:
+            try:
+                await self.collection.insert_many([document for document, _ in remaining], ordered=True)
+                committed, failed, remaining = remaining, None, []
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                if e.details.get("writeConcernErrors"):
+                    logger.warning(f"Group commit write concern not satisfied: {e.details['writeConcernErrors']}")
+                if not errors:
+                    # Nothing was rejected; failing the callers would report
+                    # stored orders as lost and invite duplicate retries
+                    committed, failed, remaining = remaining, None, []
+                else:
+                    index = errors[0]["index"]
+                    committed, failed, remaining = remaining[:index], (remaining[index], errors[0]), remaining[index + 1:]
+            except Exception as e:
+                self._fail(remaining, e)
+                break
+
+            for _, future in committed:
+                if not future.done():
+                    future.set_result(None)
+            if failed is not None:
+                (_, future), error = failed
+                if not future.done():
+                    future.set_exception(_write_error(error))
+        self.commit_seconds_total += time.perf_counter() - started
+
+    @staticmethod
+    def _fail(entries, exc):
+        for _, future in entries:
+            if not future.done():
+                future.set_exception(exc)
+
+    async def drain(self):
+        """Commit anything still waiting for its window and wait for in-flight batches"""
+        self._flush()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    def stats(self):
+        return {
+            "pending": len(self._pending),
+            "batches": self.batches,
+            "documents": self.documents,
+            "commit_seconds_total": self.commit_seconds_total,
+        }
@@ -0,0 +1,72 @@
+"""Pre-encoded JSON responses with strong ETags for cacheable GET endpoints.
+
+Payloads that are shared by every client are encoded to bytes once per
+content version and reused; a matching ``If-None-Match`` gets a bodyless 304.
+Compressed variants are built on first request per encoding and kept with the
+body, each with its own ETag, so compression is paid once per version.
+"""
+import hashlib
+import os
+
+import orjson
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from utils import compression
+
+DEFAULT_MAX_AGE = int(os.environ.get("HTTP_CACHE_MAX_AGE", "60"))
+
+
+def encode_json(payload):
+    """Encode a payload to compact UTF-8 JSON; anything orjson does not know goes through jsonable_encoder"""
+    return orjson.dumps(payload, default=jsonable_encoder)
+
+
+class CachedBody:
+    """A JSON body encoded once, with its strong ETag and Cache-Control"""
+
+    def __init__(self, payload, max_age=DEFAULT_MAX_AGE):
+        self.body = encode_json(payload)
+        self.etag = '"' + hashlib.sha256(self.body).hexdigest()[:32] + '"'
+        self.cache_control = f"public, max-age={max_age}"
+        # encoding -> (compressed body, ETag)
+        self._variants = {}
+
+    def variant(self, encoding):
+        """``(body, etag, encoding)`` to send to a client accepting ``encoding``"""
+        if encoding is None or len(self.body) < compression.MIN_SIZE:
+            return self.body, self.etag, None
+        cached = self._variants.get(encoding)
+        if cached is None:
+            cached = self._variants[encoding] = (
+                compression.compress(self.body, encoding, best=True),
+                f'{self.etag[:-1]}-{encoding}"',
+                encoding
+            )
+        return cached
+
+
+def etag_matches(if_none_match, etag):
+    """Weak comparison as required for If-None-Match (RFC 9110 13.1.2)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def respond(request: Request, cached: CachedBody):
+    """Serve a cached body (compressed if the client accepts it), or a 304 when the client already has it"""
+    body, etag, encoding = cached.variant(compression.choose_encoding(request.headers.get("accept-encoding")))
+    headers = {"ETag": etag, "Cache-Control": cached.cache_control, "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
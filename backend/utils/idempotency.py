@@ -0,0 +1,177 @@
+"""Idempotency keys for retried POSTs.
+
+``IdempotencyStore.run`` executes an operation at most once per key. The
+result is kept in a bounded in-memory LRU with a TTL and in the
+``idempotency_keys`` collection, which has a unique ``_id`` and a TTL index,
+so replays hitting another worker or arriving after a restart still get the
+original response. A concurrent duplicate in the same worker waits for the
+in-flight request; one in a different worker gets ``IdempotencyInProgress``
+(the route turns it into a 409 with ``Retry-After``) rather than waiting.
+Reusing a key with a different request body raises ``IdempotencyConflict``.
+
+A claim records when it was taken (``claimed_at``). If the worker holding it
+dies mid-request the claim is never released, so a retry may take over a
+pending claim older than ``IDEMPOTENCY_LEASE_SECONDS``. The lease must be
+longer than any real request: one still running when it expires can end up
+executed twice.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+TTL_SECONDS = int(os.environ.get("IDEMPOTENCY_TTL_SECONDS", "86400"))
+MAX_ENTRIES = int(os.environ.get("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+LEASE_SECONDS = float(os.environ.get("IDEMPOTENCY_LEASE_SECONDS", "10"))
+COLLECTION = "idempotency_keys"
+
+
+class IdempotencyConflict(Exception):
+    """The key was already used for a different request"""
+
+
+class IdempotencyInProgress(Exception):
+    """Another worker is still processing the first request with this key"""
+
+
+def fingerprint(payload: str) -> str:
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class IdempotencyStore:
+    def __init__(self, ttl_seconds=TTL_SECONDS, max_entries=MAX_ENTRIES, lease_seconds=LEASE_SECONDS):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self.lease = timedelta(seconds=lease_seconds)
+        # key -> (expires_at, fingerprint, result)
+        self._cache = OrderedDict()
+        self._inflight = {}
+
+    def _cached(self, key):
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return entry
+
+    def _remember(self, key, request_fingerprint, result):
+        self._cache[key] = (time.monotonic() + self.ttl, request_fingerprint, result)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    async def lookup(self, db, key, request_fingerprint):
+        """Return the stored result for ``key`` without claiming it, or None
+
+        Lets a caller skip work only a first execution should do (such as
+        charging a rate limit) when the request is a replay. Raises like
+        ``run`` for a different body or a claim another worker still holds.
+        """
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            await asyncio.wait([inflight])
+        cached = self._cached(key)
+        if cached is not None:
+            if cached[1] != request_fingerprint:
+                raise IdempotencyConflict()
+            return cached[2]
+
+        record = await db[COLLECTION].find_one({"_id": key})
+        if record is None:
+            return None
+        if record["fingerprint"] != request_fingerprint:
+            raise IdempotencyConflict()
+        if record["status"] == "done":
+            self._remember(key, request_fingerprint, record["result"])
+            return record["result"]
+        if datetime.utcnow() - record.get("claimed_at", record["created_at"]) < self.lease:
+            raise IdempotencyInProgress()
+        return None
+
+    async def run(self, db, key, request_fingerprint, operation):
+        """Return ``(result, replayed)``; ``operation`` is awaited at most once per key"""
+        while True:
+            cached = self._cached(key)
+            if cached is not None:
+                if cached[1] != request_fingerprint:
+                    raise IdempotencyConflict()
+                return cached[2], True
+
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            # Same key in flight in this worker: wait for it, then re-check the cache.
+            # If the first attempt failed nothing was cached and this request runs itself.
+            await asyncio.wait([inflight])
+
+        done = asyncio.get_running_loop().create_future()
+        self._inflight[key] = done
+        try:
+            return await self._run_once(db, key, request_fingerprint, operation)
+        finally:
+            del self._inflight[key]
+            done.set_result(None)
+
+    async def _run_once(self, db, key, request_fingerprint, operation):
+        collection = db[COLLECTION]
+        claim = uuid.uuid4().hex
+        now = datetime.utcnow()
+        try:
+            await collection.insert_one({
+                "_id": key,
+                "fingerprint": request_fingerprint,
+                "status": "pending",
+                "claim": claim,
+                "claimed_at": now,
+                "created_at": now
+            })
+        except DuplicateKeyError:
+            record = await collection.find_one({"_id": key})
+            if record is None:
+                # Expired between the insert and the read; treat as in progress so the client retries
+                raise IdempotencyInProgress()
+            if record["fingerprint"] != request_fingerprint:
+                raise IdempotencyConflict()
+            if record["status"] == "done":
+                self._remember(key, request_fingerprint, record["result"])
+                return record["result"], True
+            claimed_at = record.get("claimed_at", record["created_at"])
+            if now - claimed_at < self.lease:
+                raise IdempotencyInProgress()
+            # The claim outlived its lease, so its worker died mid-request; take it
+            # over unless another retry got there first
+            taken = await collection.update_one(
+                {"_id": key, "status": "pending", "claim": record.get("claim")},
+                {"$set": {"claim": claim, "claimed_at": now}}
+            )
+            if taken.modified_count == 0:
+                raise IdempotencyInProgress()
+            logger.warning(f"Took over abandoned idempotency claim {key}")
+
+        try:
+            result = await operation()
+        except BaseException:
+            # Release the claim so the client can retry with the same key
+            await collection.delete_one({"_id": key, "status": "pending", "claim": claim})
+            raise
+
+        try:
+            await collection.update_one({"_id": key}, {"$set": {"status": "done", "result": result}})
+        except Exception as e:
+            logger.error(f"Failed to persist idempotency record {key}: {str(e)}")
+        self._remember(key, request_fingerprint, result)
+        return result, False
+
+
+store = IdempotencyStore()
@@ -0,0 +1,91 @@
+"""Time-ordered order IDs.
+
+An ID packs 64 bits, Snowflake style, and is written as 13 Crockford base32
+characters after a prefix, e.g. ``ORD0CJ8ZQ9M1X3G0``:
+
+- 42 bits: milliseconds since 2024-01-01 UTC (good for ~139 years)
+- 10 bits: worker number
+- 12 bits: per-millisecond sequence
+
+IDs are fixed width, so sorting them as strings sorts them by creation time,
+and new orders land at the right-hand edge of the ``order_id`` index.
+Uniqueness across processes comes from the worker number: set
+``ORDER_ID_WORKER`` (0-1023) per worker where several run at once; without
+it the number is derived from the host name and process id, and two
+processes can occasionally hash to the same number (order creation retries
+with a fresh ID if that ever produces a duplicate). IDs keep increasing even
+if the wall clock steps backwards.
+
+``new_order_id`` delegates to a module-level generator that can be swapped
+with ``set_generator`` (anything with a ``next_id()`` method).
+"""
+import hashlib
+import os
+import socket
+import threading
+import time
+
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+EPOCH_MS = 1704067200000  # 2024-01-01T00:00:00Z
+TIME_BITS = 42
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+ID_LENGTH = 13
+PREFIX = "ORD"
+
+MAX_WORKER = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+
+def _default_worker():
+    configured = os.environ.get("ORDER_ID_WORKER")
+    if configured:
+        return int(configured) & MAX_WORKER
+    seed = f"{socket.gethostname()}:{os.getpid()}".encode("utf-8")
+    return int.from_bytes(hashlib.sha256(seed).digest()[:2], "big") & MAX_WORKER
+
+
+def encode(value):
+    chars = []
+    for _ in range(ID_LENGTH):
+        chars.append(ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+class SnowflakeGenerator:
+    def __init__(self, worker=None, prefix=PREFIX, clock=time.time):
+        self.worker = _default_worker() if worker is None else worker & MAX_WORKER
+        self.prefix = prefix
+        self.clock = clock
+        self._last_ms = 0
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def next_id(self):
+        with self._lock:
+            now_ms = int(self.clock() * 1000) - EPOCH_MS
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                self._sequence = 0
+            else:
+                # Same millisecond, or the clock went backwards: keep counting from the
+                # last timestamp used, borrowing the next millisecond when the sequence runs out
+                self._sequence += 1
+                if self._sequence > MAX_SEQUENCE:
+                    self._last_ms += 1
+                    self._sequence = 0
+            value = (self._last_ms << (WORKER_BITS + SEQUENCE_BITS)) | (self.worker << SEQUENCE_BITS) | self._sequence
+        return self.prefix + encode(value)
+
+
+_generator = SnowflakeGenerator()
+
+
+def set_generator(generator):
+    global _generator
+    _generator = generator
+
+
+def new_order_id():
+    return _generator.next_id()
@@ -0,0 +1,131 @@
+"""Declarative index registry applied at startup, plus a query-plan report.
+
+``INDEXES`` is the single source of truth for the indexes the routes rely on.
+``ensure_indexes`` is idempotent: existing indexes with the same name and keys
+are left alone, and an index whose key spec changed in the registry is
+dropped and rebuilt. ``report_index_coverage`` explains the representative
+route queries in ``ROUTE_QUERIES`` and warns about any that would not use an
+index scan.
+"""
+import logging
+from datetime import datetime
+
+from pymongo import ASCENDING, DESCENDING
+
+from utils import archive, idempotency
+
+logger = logging.getLogger(__name__)
+
+INDEXES = [
+    {"collection": "orders", "name": "order_id_unique",
+     "keys": [("order_id", ASCENDING)], "unique": True},
+    # The trailing customer_name/total keys let the order summary listing be a covered query
+    {"collection": "orders", "name": "status_created_at",
+     "keys": [("order_status", ASCENDING), ("created_at", DESCENDING), ("order_id", DESCENDING),
+              ("customer_name", ASCENDING), ("total", ASCENDING)]},
+    {"collection": "orders", "name": "created_at",
+     "keys": [("created_at", DESCENDING), ("order_id", DESCENDING),
+              ("order_status", ASCENDING), ("customer_name", ASCENDING), ("total", ASCENDING)]},
+    {"collection": archive.ORDERS_ARCHIVE, "name": "order_id_unique",
+     "keys": [("order_id", ASCENDING)], "unique": True},
+    {"collection": archive.ORDERS_ARCHIVE, "name": "created_at",
+     "keys": [("created_at", ASCENDING), ("order_id", ASCENDING)]},
+    {"collection": "reviews", "name": "approved_created_at",
+     "keys": [("is_approved", ASCENDING), ("created_at", DESCENDING)]},
+    # Backs the seed upserts, so workers seeding an empty database at once cannot
+    # each insert the seed reviews; customer reviews have no seed_key
+    {"collection": "reviews", "name": "seed_key_unique",
+     "keys": [("seed_key", ASCENDING)], "unique": True,
+     "partialFilterExpression": {"seed_key": {"$exists": True}}},
+    {"collection": "contact_messages", "name": "created_at",
+     "keys": [("created_at", DESCENDING), ("_id", DESCENDING)]},
+    {"collection": archive.MESSAGES_ARCHIVE, "name": "created_at",
+     "keys": [("created_at", ASCENDING), ("_id", ASCENDING)]},
+    {"collection": "menu_items", "name": "item_id_unique",
+     "keys": [("item_id", ASCENDING)], "unique": True},
+    {"collection": "menu_items", "name": "updated_at",
+     "keys": [("updated_at", DESCENDING)]},
+    {"collection": idempotency.COLLECTION, "name": "created_at_ttl",
+     "keys": [("created_at", ASCENDING)], "expireAfterSeconds": idempotency.TTL_SECONDS},
+]
+
+# Representative shapes of the queries issued by the route modules
+ROUTE_QUERIES = [
+    {"route": "GET /api/orders/{order_id}", "collection": "orders",
+     "filter": {"order_id": "ORD00000000"}},
+    {"route": "GET /api/orders?status=", "collection": "orders",
+     "filter": {"order_status": "pending"}, "sort": {"created_at": -1, "order_id": -1}},
+    {"route": "GET /api/orders", "collection": "orders",
+     "filter": {}, "sort": {"created_at": -1, "order_id": -1}},
+    {"route": "GET /api/orders/summary", "collection": "orders",
+     "filter": {"order_status": "pending"}, "sort": {"created_at": -1, "order_id": -1},
+     "projection": {"_id": 0, "order_id": 1, "customer_name": 1, "total": 1, "order_status": 1, "created_at": 1}},
+    {"route": "GET /api/orders/export", "collection": "orders",
+     "filter": {"created_at": {"$gte": datetime(2024, 1, 1)}}, "sort": {"created_at": 1, "order_id": 1}},
+    {"route": "GET /api/reviews", "collection": "reviews",
+     "filter": {"is_approved": True}, "sort": {"created_at": -1}},
+    {"route": "GET /api/contact/messages", "collection": "contact_messages",
+     "filter": {}, "sort": {"created_at": -1, "_id": -1}},
+    {"route": "menu item lookup", "collection": "menu_items",
+     "filter": {"item_id": 0}},
+]
+
+
+async def ensure_indexes(db):
+    """Create every registry index that is missing or out of date"""
+    for spec in INDEXES:
+        collection = db[spec["collection"]]
+        options = {key: value for key, value in spec.items() if key not in ("collection", "keys")}
+        try:
+            existing = (await collection.index_information()).get(spec["name"])
+            if existing is not None:
+                same_options = all(existing.get(key) == value for key, value in options.items() if key != "name")
+                same_unique = existing.get("unique", False) == spec.get("unique", False)
+                if list(existing["key"]) == list(spec["keys"]) and same_options and same_unique:
+                    continue
+                logger.info(f"Rebuilding index {spec['collection']}.{spec['name']}: definition changed")
+                await collection.drop_index(spec["name"])
+            await collection.create_index(spec["keys"], **options)
+            logger.info(f"Created index {spec['collection']}.{spec['name']}")
+        except Exception as e:
+            logger.error(f"Failed to ensure index {spec['collection']}.{spec['name']}: {str(e)}")
+
+
+def _plan_stages(plan):
+    """Yield every stage name in an explain plan tree"""
+    yield plan.get("stage")
+    if "inputStage" in plan:
+        yield from _plan_stages(plan["inputStage"])
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+
+async def report_index_coverage(db):
+    """Log the winning plan of each route query and flag the ones that scan the collection"""
+    uncovered = []
+    for query in ROUTE_QUERIES:
+        find = {"find": query["collection"], "filter": query["filter"]}
+        for option in ("sort", "projection"):
+            if option in query:
+                find[option] = query[option]
+        try:
+            explain = await db.command({"explain": find, "verbosity": "queryPlanner"})
+        except Exception as e:
+            logger.warning(f"Could not explain query for {query['route']}: {str(e)}")
+            continue
+
+        winning_plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+        # Newer servers nest the classic plan under queryPlan
+        winning_plan = winning_plan.get("queryPlan", winning_plan)
+        stages = [stage for stage in _plan_stages(winning_plan) if stage]
+        if "FETCH" not in stages and "IXSCAN" in stages:
+            logger.info(f"Index coverage OK for {query['route']} (covered): {' <- '.join(stages)}")
+        elif "IXSCAN" in stages or "IDHACK" in stages or "EXPRESS_IXSCAN" in stages:
+            logger.info(f"Index coverage OK for {query['route']}: {' <- '.join(stages)}")
+        else:
+            uncovered.append(query["route"])
+            logger.warning(f"Query for {query['route']} does not use an index: {' <- '.join(stages)}")
+
+    if uncovered:
+        logger.warning(f"{len(uncovered)} route queries are not index-backed")
+    return uncovered
@@ -0,0 +1,98 @@
+"""In-memory view of active orders, bucketed by status, for the kitchen screen.
+
+The queue is rebuilt from Mongo at startup (one query over the active
+statuses) and then kept current by order creation and status transitions, so
+"what is pending / preparing right now" is a dictionary read rather than a
+query per refresh. Each bucket is insertion-ordered, oldest first, and a
+transition is an O(1) move between buckets.
+
+The view is per worker process; ``rebuild`` resynchronises it with the
+database (and runs every ``KITCHEN_QUEUE_RESYNC_SECONDS`` when that is set,
+for deployments with several workers).
+"""
+import asyncio
+import logging
+import os
+from collections import OrderedDict
+
+from models.order import ACTIVE_ORDER_STATUSES
+
+logger = logging.getLogger(__name__)
+
+RESYNC_SECONDS = float(os.environ.get("KITCHEN_QUEUE_RESYNC_SECONDS", "0"))
+
+SUMMARY_PROJECTION = {
+    "_id": 0, "order_id": 1, "customer_name": 1, "delivery_type": 1, "items": 1,
+    "total": 1, "order_status": 1, "payment_status": 1, "created_at": 1,
+}
+
+
+class KitchenQueue:
+    def __init__(self):
+        self._buckets = {status: OrderedDict() for status in ACTIVE_ORDER_STATUSES}
+        self._status = {}
+
+    def upsert(self, order):
+        """Place an order summary in the bucket for its current status"""
+        order_id = order["order_id"]
+        summary = {field: order.get(field) for field in SUMMARY_PROJECTION if field != "_id"}
+        previous = self._status.pop(order_id, None)
+        if previous is not None:
+            self._buckets[previous].pop(order_id, None)
+        status = summary["order_status"]
+        if status in self._buckets:
+            self._buckets[status][order_id] = summary
+            self._status[order_id] = status
+
+    def update(self, order_id, changes):
+        """Apply a status change to a tracked order; untracked orders are ignored"""
+        status = self._status.get(order_id)
+        if status is None:
+            return
+        summary = self._buckets[status][order_id]
+        summary.update(changes)
+        self.upsert(summary)
+
+    def active(self):
+        return {status: list(bucket.values()) for status, bucket in self._buckets.items()}
+
+    def counts(self):
+        return {status: len(bucket) for status, bucket in self._buckets.items()}
+
+    async def rebuild(self, db):
+        orders = await db.orders.find(
+            {"order_status": {"$in": list(ACTIVE_ORDER_STATUSES)}}, SUMMARY_PROJECTION
+        ).sort([("created_at", 1), ("order_id", 1)]).to_list(None)
+        self._buckets = {status: OrderedDict() for status in ACTIVE_ORDER_STATUSES}
+        self._status = {}
+        for order in orders:
+            self.upsert(order)
+        logger.info(f"Kitchen queue rebuilt: {self.counts()}")
+
+
+kitchen = KitchenQueue()
+_resync_task = None
+
+
+async def _resync_forever(db):
+    while True:
+        await asyncio.sleep(RESYNC_SECONDS)
+        try:
+            await kitchen.rebuild(db)
+        except Exception as e:
+            logger.error(f"Kitchen queue resync failed: {str(e)}")
+
+
+async def start(db):
+    global _resync_task
+    # Schedule the resync first so it can still fill the queue if this rebuild fails
+    if RESYNC_SECONDS > 0:
+        _resync_task = asyncio.create_task(_resync_forever(db))
+    await kitchen.rebuild(db)
+
+
+async def stop():
+    global _resync_task
+    if _resync_task is not None:
+        _resync_task.cancel()
+        _resync_task = None
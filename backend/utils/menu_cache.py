@@ -0,0 +1,157 @@
+"""In-process menu snapshot shared by the menu routes.
+
+The menu changes rarely but is read on almost every page view, so the routes
+serve it from a prebuilt snapshot instead of querying Mongo per request. The
+snapshot is loaded at startup and rebuilt when it is invalidated explicitly or
+when the menu version stored in the ``meta`` collection (or the newest
+``updated_at`` on ``menu_items``) moves. Anything that edits the menu should
+call ``bump_version`` so every worker picks the change up.
+"""
+import asyncio
+import logging
+import os
+import time
+
+from utils.http_cache import CachedBody
+
+logger = logging.getLogger(__name__)
+
+MENU_META_ID = "menu"
+REVALIDATE_SECONDS = float(os.environ.get("MENU_CACHE_REVALIDATE_SECONDS", "30"))
+
+
+class MenuSnapshot:
+    """Immutable view of the menu with the groupings the routes need"""
+
+    def __init__(self, items, version):
+        self.version = version
+
+        # item_id -> item, including unavailable items (get_menu_item serves those too)
+        self.items_by_id = {item["item_id"]: {**item, "id": item["item_id"]} for item in items}
+
+        available = [item for item in items if item.get("is_available") is True]
+        self.items = [self.items_by_id[item["item_id"]] for item in available]
+
+        # category -> available items, in first-seen order
+        self.items_by_category = {}
+        for item in self.items:
+            self.items_by_category.setdefault(item.get("category"), []).append(item)
+
+        self.categories = [
+            {
+                "id": index,
+                "name": category,
+                "items": [
+                    {
+                        "id": item["item_id"],
+                        "name": item["name"],
+                        "description": item["description"],
+                        "price": item["price"],
+                        "isVeg": item["is_veg"],
+                        "image": item["image"]
+                    }
+                    for item in category_items
+                ]
+            }
+            for index, (category, category_items) in enumerate(self.items_by_category.items(), start=1)
+        ]
+
+        # Encoded response bodies, built lazily and discarded with the snapshot
+        self._bodies = {}
+
+    def get_item(self, item_id):
+        return self.items_by_id.get(item_id)
+
+    def cached_body(self, key, payload):
+        """Encode ``payload`` once for this menu version and reuse it"""
+        cached = self._bodies.get(key)
+        if cached is None:
+            cached = self._bodies[key] = CachedBody(payload)
+        return cached
+
+    def categories_body(self):
+        return self.cached_body("categories", self.categories)
+
+    def items_body(self, category=None):
+        if category is None:
+            return self.cached_body("items", self.items)
+        # Unknown categories share one empty body so the cache stays bounded
+        if category not in self.items_by_category:
+            return self.cached_body("items:", [])
+        return self.cached_body(f"items:{category}", self.items_by_category[category])
+
+
+_snapshot = None
+_stale = True
+_checked_at = 0.0
+_lock = asyncio.Lock()
+
+
+async def _read_version(db):
+    """Cheap change marker: explicit meta version plus newest updated_at"""
+    meta = await db.meta.find_one({"_id": MENU_META_ID}, {"version": 1})
+    latest = await db.menu_items.find_one({}, {"_id": 0, "updated_at": 1}, sort=[("updated_at", -1)])
+    return (
+        (meta or {}).get("version", 0),
+        (latest or {}).get("updated_at"),
+    )
+
+
+async def load(db):
+    """(Re)build the snapshot from Mongo"""
+    global _snapshot, _stale, _checked_at
+    version = await _read_version(db)
+    items = await db.menu_items.find({}, {"_id": 0}).to_list(None)
+    _snapshot = MenuSnapshot(items, version)
+    _stale = False
+    _checked_at = time.monotonic()
+    logger.info(f"Menu snapshot loaded: {len(items)} items, version {version}")
+    return _snapshot
+
+
+def invalidate():
+    """Force the next read to rebuild the snapshot"""
+    global _stale
+    _stale = True
+
+
+def peek():
+    """Return the current snapshot without touching the database (may be None)"""
+    return _snapshot
+
+
+async def get_snapshot(db):
+    """Return the current snapshot, rebuilding it if stale or the menu version moved"""
+    global _checked_at
+    if _snapshot is not None and not _stale and time.monotonic() - _checked_at < REVALIDATE_SECONDS:
+        return _snapshot
+
+    async with _lock:
+        # Another request may have refreshed the snapshot while we waited
+        if _snapshot is None or _stale:
+            return await load(db)
+        if time.monotonic() - _checked_at >= REVALIDATE_SECONDS:
+            version = await _read_version(db)
+            if version != _snapshot.version:
+                return await load(db)
+            _checked_at = time.monotonic()
+        return _snapshot
+
+
+async def bump_version(db):
+    """Record a menu change so every worker rebuilds its snapshot"""
+    await db.meta.update_one({"_id": MENU_META_ID}, {"$inc": {"version": 1}}, upsert=True)
+    invalidate()
+
+
+async def lookup_items(db, item_ids):
+    """Map item_id -> menu item for ``item_ids`` with at most one query.
+
+    Served from the snapshot when it is warm; a cold cache falls back to a
+    single ``$in`` query rather than one lookup per item.
+    """
+    if _snapshot is not None and not _stale:
+        snapshot = await get_snapshot(db)
+        return {item_id: snapshot.items_by_id[item_id] for item_id in item_ids if item_id in snapshot.items_by_id}
+    items = await db.menu_items.find({"item_id": {"$in": list(set(item_ids))}}, {"_id": 0}).to_list(None)
+    return {item["item_id"]: item for item in items}
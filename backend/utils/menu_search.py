@@ -0,0 +1,262 @@
+"""In-memory search over the menu snapshot.
+
+Text from ``name``, ``description`` and ``category`` is transliterated
+(Devanagari to Latin), lowercased and folded into phonetic keys, so that
+spelling variants common in Hinglish menus collapse to the same key:
+doubled letters are merged (``tandoori``/``tandori``), ``h`` after a
+consonant is dropped (``afghani``/``afgani``, ``chilli``/``cili``), ``ee``
+and ``oo`` become ``i`` and ``u`` and a plural ``s`` is removed.
+
+The index keeps an inverted index from key to items (weighted by field), a
+sorted vocabulary for prefix matches on the last, still-being-typed query
+word, and a trigram index over the vocabulary that proposes candidates for
+typo-tolerant matches, which are then accepted by edit distance.
+
+``for_snapshot`` keeps one index per worker in step with the menu snapshot.
+When the menu version changes only items whose searchable text or
+availability changed are re-indexed.
+"""
+import bisect
+import heapq
+import re
+from collections import OrderedDict
+
+FIELD_WEIGHTS = (("name", 3.0), ("category", 2.0), ("description", 1.0))
+EXACT, PREFIX, FUZZY = 1.0, 0.8, 0.6
+MAX_CACHED_QUERIES = 256
+
+_VOWEL_SIGNS = {
+    "ा": "a", "ि": "i", "ी": "i", "ु": "u", "ू": "u", "ृ": "ri",
+    "े": "e", "ै": "ai", "ो": "o", "ौ": "au", "ॅ": "e", "ॉ": "o",
+}
+_VOWELS = {
+    "अ": "a", "आ": "a", "इ": "i", "ई": "i", "उ": "u", "ऊ": "u",
+    "ऋ": "ri", "ए": "e", "ऐ": "ai", "ओ": "o", "औ": "au",
+}
+_CONSONANTS = {
+    "क": "k", "ख": "kh", "ग": "g", "घ": "gh", "ङ": "n",
+    "च": "ch", "छ": "chh", "ज": "j", "झ": "jh", "ञ": "n",
+    "ट": "t", "ठ": "th", "ड": "d", "ढ": "dh", "ण": "n",
+    "त": "t", "थ": "th", "द": "d", "ध": "dh", "न": "n",
+    "प": "p", "फ": "f", "ब": "b", "भ": "bh", "म": "m",
+    "य": "y", "र": "r", "ल": "l", "व": "v", "श": "sh",
+    "ष": "sh", "स": "s", "ह": "h",
+}
+_NASALS = {"ं": "n", "ँ": "n"}
+_VIRAMA = "्"
+_NUKTA = "़"
+
+
+def transliterate(text):
+    """Romanize Devanagari the way it is usually typed (``मोमो`` -> ``momo``)"""
+    out = []
+    length = len(text)
+    for index, char in enumerate(text):
+        if char in _CONSONANTS:
+            out.append(_CONSONANTS[char])
+            following = text[index + 1] if index + 1 < length else ""
+            if following == _NUKTA:
+                following = text[index + 2] if index + 2 < length else ""
+            # Inherent vowel; dropped before a vowel sign or virama and at the end of a word
+            if following in _CONSONANTS or following in _NASALS:
+                out.append("a")
+        elif char in _VOWEL_SIGNS:
+            out.append(_VOWEL_SIGNS[char])
+        elif char in _VOWELS:
+            out.append(_VOWELS[char])
+        elif char in _NASALS:
+            out.append(_NASALS[char])
+        elif char in (_VIRAMA, _NUKTA):
+            continue
+        else:
+            out.append(char)
+    return "".join(out)
+
+
+_WORD = re.compile(r"[a-z0-9]+")
+_CONSONANT_H = re.compile(r"([bcdfgjklmnpqrstvwxyz])h")
+_REPEATS = re.compile(r"(.)\1+")
+
+
+def fold(word):
+    """Phonetic key for one lowercase Latin word"""
+    word = word.replace("ee", "i").replace("oo", "u").replace("ck", "k").replace("q", "k").replace("w", "v").replace("z", "j")
+    word = _CONSONANT_H.sub(r"\1", word)
+    word = _REPEATS.sub(r"\1", word)
+    if len(word) > 3 and word.endswith("s"):
+        word = word[:-1]
+    return word
+
+
+def keys(text):
+    return [fold(word) for word in _WORD.findall(transliterate(text or "").lower())]
+
+
+def trigrams(key):
+    padded = f"${key}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def within_distance(a, b, limit):
+    """Damerau-Levenshtein (adjacent transpositions) distance of a and b is <= limit"""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return False
+        previous2, previous = previous, current
+    return previous[-1] <= limit
+
+
+def _signature(item):
+    return tuple(item.get(field) for field, _ in FIELD_WEIGHTS)
+
+
+class MenuSearchIndex:
+    def __init__(self):
+        self.version = None
+        self._items = {}        # item_id -> item payload
+        self._signatures = {}   # item_id -> indexed text
+        self._item_keys = {}    # item_id -> {key: weight}
+        self._postings = {}     # key -> {item_id: weight}
+        self._trigrams = {}     # trigram -> set of keys
+        self._vocabulary = []   # sorted keys, for prefix lookups
+        self._vocabulary_dirty = False
+        self._results = OrderedDict()
+
+    def _add(self, item):
+        item_id = item["item_id"]
+        weights = {}
+        for field, weight in FIELD_WEIGHTS:
+            for key in keys(item.get(field)):
+                weights[key] = max(weights.get(key, 0.0), weight)
+        for key, weight in weights.items():
+            postings = self._postings.get(key)
+            if postings is None:
+                postings = self._postings[key] = {}
+                for gram in trigrams(key):
+                    self._trigrams.setdefault(gram, set()).add(key)
+                self._vocabulary_dirty = True
+            postings[item_id] = weight
+        self._items[item_id] = item
+        self._signatures[item_id] = _signature(item)
+        self._item_keys[item_id] = weights
+
+    def _remove(self, item_id):
+        for key in self._item_keys.pop(item_id, {}):
+            postings = self._postings[key]
+            postings.pop(item_id, None)
+            if not postings:
+                del self._postings[key]
+                for gram in trigrams(key):
+                    grams = self._trigrams[gram]
+                    grams.discard(key)
+                    if not grams:
+                        del self._trigrams[gram]
+                self._vocabulary_dirty = True
+        self._items.pop(item_id, None)
+        self._signatures.pop(item_id, None)
+
+    def sync(self, items, version=None):
+        """Bring the index in line with ``items``, touching only the ones that changed"""
+        current = {item["item_id"]: item for item in items}
+        changed = 0
+        for item_id in [item_id for item_id in self._items if item_id not in current]:
+            self._remove(item_id)
+            changed += 1
+        for item_id, item in current.items():
+            if self._signatures.get(item_id) != _signature(item):
+                self._remove(item_id)
+                self._add(item)
+                changed += 1
+            else:
+                # Price, image etc. are not indexed; just serve the latest payload
+                self._items[item_id] = item
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+        self._results.clear()
+        self.version = version
+        return changed
+
+    def _matches(self, token, allow_prefix):
+        """key -> match quality for one query token"""
+        matches = {}
+        if token in self._postings:
+            matches[token] = EXACT
+        if allow_prefix and len(token) >= 2:
+            start = bisect.bisect_left(self._vocabulary, token)
+            for key in self._vocabulary[start:]:
+                if not key.startswith(token):
+                    break
+                matches.setdefault(key, PREFIX)
+        if len(token) >= 3:
+            limit = 1 if len(token) <= 7 else 2
+            # Each edit changes at most three trigrams, so a close key shares the rest.
+            # The most common grams are skipped, lowering the bar by one each, so the
+            # candidate count is driven by the rarest grams
+            postings = sorted((self._trigrams.get(gram, ()) for gram in trigrams(token)), key=len)
+            required = max(1, len(postings) - 3 * limit)
+            shared = {}
+            for keys_with_gram in postings[:len(postings) - required + 1]:
+                for key in keys_with_gram:
+                    shared[key] = shared.get(key, 0) + 1
+            frequent = postings[len(postings) - required + 1:]
+            for key, count in shared.items():
+                if key in matches or abs(len(key) - len(token)) > limit:
+                    continue
+                count += sum(1 for keys_with_gram in frequent if key in keys_with_gram)
+                if count >= required and within_distance(token, key, limit):
+                    matches[key] = FUZZY
+        return matches
+
+    def search(self, query, limit=20):
+        """Available items matching every word of ``query``, best first"""
+        tokens = keys(query)
+        if not tokens:
+            return []
+        cache_key = (tuple(tokens), limit)
+        cached = self._results.get(cache_key)
+        if cached is not None:
+            self._results.move_to_end(cache_key)
+            return cached
+
+        scores = None
+        for position, token in enumerate(tokens):
+            token_scores = {}
+            for key, quality in self._matches(token, allow_prefix=position == len(tokens) - 1).items():
+                for item_id, weight in self._postings[key].items():
+                    score = weight * quality
+                    if score > token_scores.get(item_id, 0.0):
+                        token_scores[item_id] = score
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {item_id: score + token_scores[item_id] for item_id, score in scores.items() if item_id in token_scores}
+            if not scores:
+                break
+
+        ranked = heapq.nsmallest(limit, scores.items(), key=lambda entry: (-entry[1], self._items[entry[0]]["name"]))
+        results = [self._items[item_id] for item_id, _ in ranked]
+        self._results[cache_key] = results
+        while len(self._results) > MAX_CACHED_QUERIES:
+            self._results.popitem(last=False)
+        return results
+
+
+index = MenuSearchIndex()
+
+
+def for_snapshot(snapshot):
+    """The shared index, synced with ``snapshot`` if the menu moved since the last call"""
+    if index.version != snapshot.version:
+        index.sync(snapshot.items, snapshot.version)
+    return index
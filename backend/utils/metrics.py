@@ -0,0 +1,228 @@
+"""Process-local request and MongoDB metrics in Prometheus text format.
+
+``MetricsMiddleware`` records request counts by status and a latency
+histogram per route template (``/api/orders/{order_id}``, not the raw path,
+so cardinality stays bounded). ``MongoCommandListener`` and
+``MongoPoolListener`` are pymongo monitoring listeners that time every
+command per collection and every connection-pool checkout. ``render``
+produces the exposition served at ``/api/metrics``.
+
+Recording is a dictionary lookup, a bisect and a few additions under a lock,
+cheap enough to leave on in production. Values are per worker process;
+Prometheus aggregates across workers.
+"""
+import threading
+import time
+from bisect import bisect_left
+
+from pymongo import monitoring
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in sorted(values):
+            yield f"{self.name}{{{_labels(self.label_names, labels)}}} {value}"
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_names, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, seconds):
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            value = self._values.get(labels)
+            if value is None:
+                value = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            value[0][index] += 1
+            value[1] += seconds
+            value[2] += 1
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            values = [(labels, (list(counts), total, count)) for labels, (counts, total, count) in self._values.items()]
+        for labels, (counts, total, count) in sorted(values):
+            label_text = _labels(self.label_names, labels)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f'{self.name}_bucket{{{label_text},le="{le}"}} {cumulative}'
+            yield f"{self.name}_sum{{{label_text}}} {total}"
+            yield f"{self.name}_count{{{label_text}}} {count}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values):
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+http_requests = Counter("http_requests_total", "HTTP requests by route template and status", ("method", "route", "status"))
+http_latency = Histogram("http_request_duration_seconds", "HTTP request latency by route template", ("method", "route"))
+mongo_latency = Histogram("mongodb_command_duration_seconds", "MongoDB command latency", ("collection", "command"))
+mongo_failures = Counter("mongodb_command_failures_total", "Failed MongoDB commands", ("collection", "command"))
+mongo_checkout = Histogram("mongodb_pool_checkout_seconds", "Time spent waiting for a pooled connection", ("address",))
+mongo_checkout_failures = Counter("mongodb_pool_checkout_failures_total", "Failed connection checkouts", ("address", "reason"))
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route request counts and latency"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the shared scope
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            elapsed = time.perf_counter() - started
+            http_requests.inc((scope["method"], template, status))
+            http_latency.observe((scope["method"], template), elapsed)
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    def __init__(self):
+        self._collections = {}
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            collection = event.command.get("collection")
+        self._collections[(event.request_id, event.connection_id)] = collection if isinstance(collection, str) else ""
+
+    def _finish(self, event):
+        return self._collections.pop((event.request_id, event.connection_id), "")
+
+    def succeeded(self, event):
+        mongo_latency.observe((self._finish(event), event.command_name), event.duration_micros / 1e6)
+
+    def failed(self, event):
+        labels = (self._finish(event), event.command_name)
+        mongo_latency.observe(labels, event.duration_micros / 1e6)
+        mongo_failures.inc(labels)
+
+
+class MongoPoolListener(monitoring.ConnectionPoolListener):
+    """Times checkouts; start and finish events fire on the same thread"""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        started = getattr(self._local, "started", None)
+        if started is not None:
+            mongo_checkout.observe((f"{event.address[0]}:{event.address[1]}",), time.perf_counter() - started)
+            self._local.started = None
+
+    def connection_check_out_failed(self, event):
+        self._local.started = None
+        mongo_checkout_failures.inc((f"{event.address[0]}:{event.address[1]}", event.reason))
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def connection_checked_in(self, event):
+        pass
+
+
+# Gauges sampled at scrape time: name -> (help, label names, callable returning {labels: value})
+_gauges = {}
+
+
+def register_gauge(name, help_text, label_names, collect):
+    """Expose state owned by another module; ``collect`` runs on every scrape"""
+    _gauges[name] = (help_text, label_names, collect)
+
+
+def _render_gauges():
+    for name, (help_text, label_names, collect) in sorted(_gauges.items()):
+        yield f"# HELP {name} {help_text}"
+        yield f"# TYPE {name} gauge"
+        for labels, value in sorted(collect().items()):
+            if label_names:
+                yield f"{name}{{{_labels(label_names, labels)}}} {value}"
+            else:
+                yield f"{name} {value}"
+
+
+# Counters and histograms owned by other modules, rendered after the built-in ones
+_registered = []
+
+
+def register(metric):
+    """Expose a ``Counter`` or ``Histogram`` created by another module; returns it"""
+    _registered.append(metric)
+    return metric
+
+
+def render():
+    lines = []
+    for metric in (http_requests, http_latency, mongo_latency, mongo_failures, mongo_checkout, mongo_checkout_failures, *_registered):
+        lines.extend(metric.render())
+    lines.extend(_render_gauges())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,111 @@
+"""In-process pub/sub hub for order status updates.
+
+Publishers (order creation and status transitions) call ``hub.publish``;
+each open ``/api/orders/{order_id}/events`` stream holds a small queue
+subscribed to one order. The hub also remembers the last few events and the
+current state per order, so a client connecting or resuming with
+``Last-Event-ID`` usually needs no database query at all. Event ids are a
+per-order sequence number; they are only meaningful within one worker
+process.
+
+A stream opens with a ``snapshot`` of the current status, or with the
+events missed since ``Last-Event-ID`` (or ``?last_event_id=``), and sends
+comment heartbeats while idle. Once the order is delivered or cancelled it
+sends a final ``end`` event (id ``end``) and closes; a client reconnecting
+with ``Last-Event-ID: end`` gets a 204, which stops ``EventSource`` from
+retrying.
+"""
+import asyncio
+import json
+from collections import OrderedDict, deque
+from datetime import datetime
+
+HISTORY_PER_ORDER = 16
+MAX_TRACKED_ORDERS = 10000
+SUBSCRIBER_QUEUE_SIZE = 32
+TERMINAL_STATUSES = ("delivered", "cancelled")
+
+
+class OrderEventHub:
+    def __init__(self, history=HISTORY_PER_ORDER, max_orders=MAX_TRACKED_ORDERS):
+        self.history = history
+        self.max_orders = max_orders
+        self._subscribers = {}
+        # order_id -> {"seq": int, "state": dict, "events": deque[(seq, type, data)]}, LRU-bounded
+        self._orders = OrderedDict()
+
+    def _track(self, order_id):
+        entry = self._orders.get(order_id)
+        if entry is None:
+            entry = self._orders[order_id] = {"seq": 0, "state": {}, "events": deque(maxlen=self.history)}
+            while len(self._orders) > self.max_orders:
+                # Evict the least recently updated order nobody is watching
+                for candidate in self._orders:
+                    if candidate != order_id and candidate not in self._subscribers:
+                        del self._orders[candidate]
+                        break
+                else:
+                    break
+        else:
+            self._orders.move_to_end(order_id)
+        return entry
+
+    def publish(self, order_id, event_type, data):
+        """Record an event for ``order_id`` and push it to every subscriber"""
+        entry = self._track(order_id)
+        entry["seq"] += 1
+        entry["state"].update(data)
+        event = (entry["seq"], event_type, {"order_id": order_id, **data})
+        entry["events"].append(event)
+        for queue in self._subscribers.get(order_id, ()):
+            if queue.full():
+                # A stalled client loses its oldest pending event, never blocks publishers
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def prime(self, order_id, state):
+        """Seed the state of an order loaded from the database, without emitting an event"""
+        entry = self._track(order_id)
+        if not entry["state"]:
+            entry["state"].update(state)
+
+    def subscribe(self, order_id):
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(order_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, order_id, queue):
+        queues = self._subscribers.get(order_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[order_id]
+
+    def state(self, order_id):
+        """Last known ``(seq, state)`` for an order, or None if the hub has not seen it"""
+        entry = self._orders.get(order_id)
+        if entry is None or not entry["state"]:
+            return None
+        return entry["seq"], dict(entry["state"])
+
+    def events_since(self, order_id, seq):
+        """Events after ``seq``, or None if they are no longer all in history"""
+        entry = self._orders.get(order_id)
+        if entry is None or seq > entry["seq"]:
+            return None
+        events = [event for event in entry["events"] if event[0] > seq]
+        if len(events) != entry["seq"] - seq:
+            return None
+        return events
+
+    def subscriber_count(self):
+        return sum(len(queues) for queues in self._subscribers.values())
+
+
+def format_event(seq, event_type, data):
+    """Serialize one Server-Sent Event"""
+    payload = json.dumps(data, default=lambda value: value.isoformat() if isinstance(value, datetime) else str(value))
+    return f"id: {seq}\nevent: {event_type}\ndata: {payload}\n\n"
+
+
+hub = OrderEventHub()
@@ -0,0 +1,44 @@
+"""Opaque keyset cursors for newest-first listings.
+
+A cursor encodes the ``(created_at, tiebreaker)`` of the last row on a page.
+The next page is the bounded index range strictly after that key, so its cost
+does not depend on how deep the caller has paged (unlike ``skip``).
+"""
+import base64
+import json
+from datetime import datetime
+
+from fastapi import HTTPException
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, key) -> str:
+    payload = json.dumps([created_at.isoformat(), str(key)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str):
+    """Return ``(created_at, key)`` or raise a 400 for a malformed token"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), key
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def after_filter(created_at: datetime, key, key_field: str):
+    """Match rows that sort after ``(created_at, key)`` in descending order"""
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, key_field: {"$lt": key}},
+    ]}
+
+
+def next_cursor(rows, limit: int, key_field: str):
+    """Cursor for the page following ``rows``, or None on the last page"""
+    if limit <= 0 or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(last["created_at"], last[key_field])
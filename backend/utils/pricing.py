@@ -0,0 +1,158 @@
+"""Cart pricing shared by order creation and ``POST /api/orders/quote``.
+
+The rules come from the ``PRICING_RULES`` environment variable (JSON) and are
+compiled once into a ``PricingTable``; ``set_rules`` swaps in a new table.
+The default table reproduces the original behaviour: ₹30 delivery, no tax,
+no promotions. The shape is::
+
+    {
+      "delivery_charges": {"delivery": 30, "pickup": 0},
+      "free_delivery_above": null,          # subtotal at which delivery is free
+      "tax_percent": 0,                     # applied to subtotal - discount
+      "promotions": [
+        {"code": "MOMO10", "type": "percent", "value": 10, "max_discount": 50,
+         "min_subtotal": 200, "category": null, "auto": false}
+      ]
+    }
+
+Promotion types are ``percent`` (1-100) and ``flat`` (off the subtotal, or
+off one category's lines) and ``free_delivery``. ``auto`` promotions apply without a
+code. At most one promotion applies per cart: the requested code, or else
+the automatic one that saves the most. Amounts are whole rupees.
+"""
+import json
+import os
+
+PROMOTION_TYPES = ("percent", "flat", "free_delivery")
+
+DEFAULT_RULES = {
+    "delivery_charges": {"delivery": 30, "pickup": 0},
+    "free_delivery_above": None,
+    "tax_percent": 0,
+    "promotions": [],
+}
+
+
+class CartError(Exception):
+    """A cart that cannot be priced; ``detail`` is the 422 response body"""
+
+    def __init__(self, detail):
+        super().__init__(detail)
+        self.detail = detail
+
+
+def build_lines(menu_items, order_items):
+    """Price each requested item from ``menu_items`` (item_id -> menu item)"""
+    unknown = sorted({item.item_id for item in order_items if item.item_id not in menu_items})
+    unavailable = sorted({
+        item.item_id for item in order_items
+        if item.item_id in menu_items and menu_items[item.item_id].get("is_available") is not True
+    })
+    if unknown or unavailable:
+        raise CartError({
+            "message": "Some items cannot be ordered",
+            "unknown_items": unknown,
+            "unavailable_items": unavailable
+        })
+    return [
+        {
+            "item_id": item.item_id,
+            "name": menu_items[item.item_id]["name"],
+            "price": menu_items[item.item_id]["price"],
+            "quantity": item.quantity,
+            "category": menu_items[item.item_id].get("category"),
+        }
+        for item in order_items
+    ]
+
+
+class Promotion:
+    __slots__ = ("code", "type", "value", "max_discount", "min_subtotal", "category", "auto")
+
+    def __init__(self, rule):
+        if rule.get("type") not in PROMOTION_TYPES:
+            raise ValueError(f"Unknown promotion type: {rule.get('type')!r}")
+        self.code = rule.get("code")
+        self.type = rule["type"]
+        self.value = int(rule.get("value", 0))
+        self.max_discount = rule.get("max_discount")
+        self.min_subtotal = int(rule.get("min_subtotal", 0))
+        self.category = rule.get("category")
+        self.auto = bool(rule.get("auto", False))
+        if not self.code and not self.auto:
+            raise ValueError("A promotion needs a code or auto: true")
+        if self.type == "percent" and not 1 <= self.value <= 100:
+            raise ValueError(f"Promotion {self.code!r}: percent value must be between 1 and 100")
+        if self.type == "flat" and self.value < 0:
+            raise ValueError(f"Promotion {self.code!r}: flat value must not be negative")
+        if self.max_discount is not None and int(self.max_discount) < 0:
+            raise ValueError(f"Promotion {self.code!r}: max_discount must not be negative")
+
+    def savings(self, lines, subtotal, delivery_charge):
+        """``(discount, waived_delivery)`` or None if the cart does not qualify"""
+        if subtotal < self.min_subtotal:
+            return None
+        if self.type == "free_delivery":
+            return (0, delivery_charge) if delivery_charge else None
+        base = subtotal
+        if self.category is not None:
+            base = sum(line["price"] * line["quantity"] for line in lines if line["category"] == self.category)
+            if not base:
+                return None
+        discount = base * self.value // 100 if self.type == "percent" else min(self.value, base)
+        if self.max_discount is not None:
+            discount = min(discount, int(self.max_discount))
+        return (discount, 0) if discount > 0 else None
+
+
+class PricingTable:
+    def __init__(self, rules):
+        rules = {**DEFAULT_RULES, **rules}
+        self.delivery_charges = {name: int(charge) for name, charge in rules["delivery_charges"].items()}
+        self.free_delivery_above = rules["free_delivery_above"]
+        # Basis points, so tax is integer arithmetic
+        self.tax_bp = round(float(rules["tax_percent"]) * 100)
+        promotions = [Promotion(rule) for rule in rules["promotions"]]
+        self.by_code = {promotion.code.upper(): promotion for promotion in promotions if promotion.code}
+        self.automatic = [promotion for promotion in promotions if promotion.auto]
+
+    def _promotion(self, lines, subtotal, delivery_charge, promo_code):
+        if promo_code:
+            promotion = self.by_code.get(promo_code.strip().upper())
+            savings = promotion.savings(lines, subtotal, delivery_charge) if promotion else None
+            if savings is None:
+                raise CartError({"message": "Promo code is not valid for this order", "promo_code": promo_code})
+            return promotion, savings
+        best = None
+        for promotion in self.automatic:
+            savings = promotion.savings(lines, subtotal, delivery_charge)
+            if savings is not None and (best is None or sum(savings) > sum(best[1])):
+                best = (promotion, savings)
+        return best or (None, (0, 0))
+
+    def quote(self, lines, delivery_type, promo_code=None):
+        subtotal = sum(line["price"] * line["quantity"] for line in lines)
+        delivery_charge = self.delivery_charges.get(delivery_type, 0)
+        if self.free_delivery_above is not None and subtotal >= self.free_delivery_above:
+            delivery_charge = 0
+        promotion, (discount, waived) = self._promotion(lines, subtotal, delivery_charge, promo_code)
+        delivery_charge -= waived
+        tax = ((subtotal - discount) * self.tax_bp + 5000) // 10000
+        return {
+            "subtotal": subtotal,
+            "discount": discount,
+            "delivery_charge": delivery_charge,
+            "tax": tax,
+            "total": subtotal - discount + delivery_charge + tax,
+            "promotion": None if promotion is None else {
+                "code": promotion.code, "type": promotion.type, "savings": discount + waived
+            },
+        }
+
+
+table = PricingTable(json.loads(os.environ.get("PRICING_RULES") or "{}"))
+
+
+def set_rules(rules):
+    global table
+    table = PricingTable(rules)
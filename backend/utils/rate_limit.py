@@ -0,0 +1,144 @@
+"""Token-bucket rate limiting for the public write endpoints.
+
+Each route has limits per dimension (client IP, and the phone number in the
+body where there is one), written as ``"<requests>/<seconds>"`` and
+overridable with ``RATE_LIMIT_<ROUTE>_<DIMENSION>`` environment variables,
+e.g. ``RATE_LIMIT_ORDERS_IP=30/60``. A bucket holds up to ``requests`` tokens
+and refills at ``requests / seconds`` per second. Rejections are a 429 with
+``Retry-After`` and happen before the database is touched.
+
+Behind a load balancer ``request.client`` is the balancer, so the client
+address is read from ``X-Forwarded-For``. Only the entries appended by our
+own proxies can be trusted (anything to their left is whatever the client
+sent), so with ``RATE_LIMIT_PROXY_HOPS=N`` the key is the N-th entry from
+the right. The default of 1 matches the deployment behind a single hosting
+load balancer; set it to 0 when uvicorn faces clients directly. The per-IP
+defaults allow for many customers sharing one mobile-carrier NAT address;
+the per-phone limits are the tight ones.
+
+Buckets live in a ``RateLimitBackend``. ``LocalBackend`` keeps them in a
+bounded LRU in this process. To share limits across workers, point
+``RATE_LIMIT_BACKEND`` at another implementation as ``"module:Class"``
+(for example one backed by Redis).
+"""
+import importlib
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from fastapi import HTTPException, Request
+
+ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+MAX_BUCKETS = int(os.environ.get("RATE_LIMIT_MAX_BUCKETS", "100000"))
+PROXY_HOPS = int(os.environ.get("RATE_LIMIT_PROXY_HOPS", "1"))
+
+DEFAULT_LIMITS = {
+    "orders": {"ip": "60/60", "phone": "10/600"},
+    "reviews": {"ip": "30/600"},
+    "contact": {"ip": "30/600", "phone": "3/600"},
+}
+
+
+def parse_limit(value):
+    """``"30/60"`` -> (capacity 30, refill 0.5 tokens per second)"""
+    count, _, seconds = value.partition("/")
+    capacity = float(count)
+    return capacity, capacity / float(seconds or 1)
+
+
+def _load_limits():
+    limits = {}
+    for route, dimensions in DEFAULT_LIMITS.items():
+        for dimension, default in dimensions.items():
+            value = os.environ.get(f"RATE_LIMIT_{route.upper()}_{dimension.upper()}", default)
+            limits[(route, dimension)] = parse_limit(value)
+    return limits
+
+
+class RateLimitBackend(ABC):
+    @abstractmethod
+    async def take(self, key, capacity, refill_per_second):
+        """Consume one token; return 0 if allowed, else seconds until a token is available"""
+
+
+class LocalBackend(RateLimitBackend):
+    """In-process buckets in an LRU capped at ``max_buckets`` entries"""
+
+    def __init__(self, max_buckets=MAX_BUCKETS):
+        self.max_buckets = max_buckets
+        self._buckets = OrderedDict()
+
+    async def take(self, key, capacity, refill_per_second):
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * refill_per_second)
+        if tokens >= 1:
+            tokens -= 1
+            retry_after = 0.0
+        else:
+            retry_after = (1 - tokens) / refill_per_second
+        self._buckets[key] = (tokens, now)
+        # Evicting the least recently seen bucket only ever forgives a client
+        while len(self._buckets) > self.max_buckets:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+def _make_backend():
+    path = os.environ.get("RATE_LIMIT_BACKEND")
+    if not path:
+        return LocalBackend()
+    module_name, _, class_name = path.partition(":")
+    configured = getattr(importlib.import_module(module_name), class_name)()
+    # Fail at startup rather than on the first rate-limited request
+    if not isinstance(configured, RateLimitBackend):
+        raise TypeError(f"RATE_LIMIT_BACKEND {path} is not a RateLimitBackend")
+    return configured
+
+
+backend = _make_backend()
+limits = _load_limits()
+
+
+def client_ip(request: Request, hops=None):
+    """Address seen by the outermost trusted proxy, or the peer address without proxies"""
+    hops = PROXY_HOPS if hops is None else hops
+    if hops > 0:
+        # Repeated headers are equivalent to one comma-joined list
+        entries = [
+            entry.strip()
+            for header in request.headers.getlist("x-forwarded-for")
+            for entry in header.split(",")
+            if entry.strip()
+        ]
+        if entries:
+            return entries[-min(hops, len(entries))]
+    return request.client.host if request.client else "unknown"
+
+
+async def enforce(route, dimension, value):
+    """Raise a 429 if ``value`` has used up its ``route``/``dimension`` budget"""
+    if not ENABLED or not value or (route, dimension) not in limits:
+        return
+    if dimension == "phone":
+        # "+91 98100-00000" and "9810000000" share a bucket
+        value = "".join(ch for ch in value if ch.isdigit())[-10:] or value
+    capacity, refill = limits[(route, dimension)]
+    retry_after = await backend.take(f"{route}:{dimension}:{value}", capacity, refill)
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests, please try again later",
+            headers={"Retry-After": str(max(1, int(retry_after + 0.999)))}
+        )
+
+
+def per_ip(route):
+    """Route dependency enforcing the per-IP limit for ``route``"""
+    async def dependency(request: Request):
+        await enforce(route, "ip", client_ip(request))
+    return dependency
@@ -0,0 +1,136 @@
+"""Running rating aggregate over approved reviews.
+
+A single ``meta`` document (``_id: "ratings"``) holds the count, the sum and
+a per-star histogram of approved ratings, so the average is always one
+document read away and never needs an aggregation over ``reviews``. Each
+worker keeps the last read in memory for ``RATING_STATS_TTL`` seconds; its
+own approvals refresh it immediately. ``version`` changes whenever the cached
+figures do, so callers can rebuild anything derived from them.
+
+Approval and counting are separate writes, so counting is made idempotent
+per review: ``count_approved`` adds each approved review whose
+``rating_counted`` flag is unset with an ``$inc`` that also pushes the review
+id onto the aggregate's ``pending`` list (and only applies while the id is
+not already there), then sets ``rating_counted`` and pulls the id again. A
+count interrupted at any step is finished by the next ``count_approved``
+without being added twice.
+
+``rebuild`` recomputes the document from the reviews collection and flags
+the reviews it counted; it runs when the document is missing or predates
+``pending`` (first start) and after seeding changes reviews. It is meant for
+quiet moments: an approval counted while it runs can be lost or doubled.
+"""
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+META_ID = "ratings"
+STARS = (1, 2, 3, 4, 5)
+TTL_SECONDS = float(os.environ.get("RATING_STATS_TTL", "60"))
+
+_stats = None
+_checked_at = 0.0
+_lock = asyncio.Lock()
+version = 0
+
+
+def summarize(document):
+    """Public view of an aggregate document"""
+    count = document.get("count", 0)
+    histogram = document.get("stars", {})
+    return {
+        "average": round(document.get("sum", 0) / count, 1) if count else None,
+        "count": count,
+        "histogram": {str(star): histogram.get(str(star), 0) for star in STARS},
+    }
+
+
+def _set(document):
+    global _stats, _checked_at, version
+    stats = summarize(document)
+    _checked_at = time.monotonic()
+    if stats != _stats:
+        _stats = stats
+        version += 1
+    return _stats
+
+
+def invalidate():
+    global _checked_at
+    _checked_at = 0.0
+
+
+async def rebuild(db):
+    reviews = await db.reviews.find({"is_approved": True}, {"rating": 1}).to_list(None)
+    document = {"count": 0, "sum": 0, "stars": {}, "pending": [], "updated_at": datetime.utcnow()}
+    for review in reviews:
+        rating = review.get("rating")
+        # Reviews stored before ratings were range-checked are left out
+        if rating in STARS:
+            document["count"] += 1
+            document["sum"] += rating
+            document["stars"][str(rating)] = document["stars"].get(str(rating), 0) + 1
+    # Flag first, so count_approved never adds these reviews on top of the rebuilt totals
+    await db.reviews.update_many(
+        {"_id": {"$in": [review["_id"] for review in reviews]}},
+        {"$set": {"rating_counted": True}}
+    )
+    await db.meta.replace_one({"_id": META_ID}, document, upsert=True)
+    logger.info(f"Rating aggregate rebuilt from {document['count']} approved reviews")
+    return _set(document)
+
+
+async def get(db):
+    """Current stats, read from the aggregate document at most once per TTL"""
+    if _stats is not None and time.monotonic() - _checked_at < TTL_SECONDS:
+        return _stats
+    async with _lock:
+        if _stats is not None and time.monotonic() - _checked_at < TTL_SECONDS:
+            return _stats
+        return await _load(db)
+
+
+async def _load(db):
+    document = await db.meta.find_one({"_id": META_ID})
+    if document is None or "pending" not in document:
+        return await rebuild(db)
+    return _set(document)
+
+
+async def ensure(db):
+    """Make sure the aggregate document exists; call before approving a review"""
+    async with _lock:
+        return await _load(db)
+
+
+async def _count(db, review):
+    review_id = review["_id"]
+    rating = review.get("rating")
+    if rating in STARS:
+        # No-op when an earlier, interrupted attempt already added this review
+        await db.meta.update_one(
+            {"_id": META_ID, "pending": {"$ne": review_id}},
+            {
+                "$inc": {"count": 1, "sum": rating, f"stars.{rating}": 1},
+                "$push": {"pending": review_id},
+                "$set": {"updated_at": datetime.utcnow()}
+            }
+        )
+    await db.reviews.update_one({"_id": review_id}, {"$set": {"rating_counted": True}})
+    await db.meta.update_one({"_id": META_ID}, {"$pull": {"pending": review_id}})
+
+
+async def count_approved(db):
+    """Add every approved review not yet in the aggregate; safe to repeat after a failure"""
+    await ensure(db)
+    reviews = await db.reviews.find(
+        {"is_approved": True, "rating_counted": {"$ne": True}}, {"rating": 1}
+    ).to_list(None)
+    for review in reviews:
+        await _count(db, review)
+    async with _lock:
+        return await _load(db)
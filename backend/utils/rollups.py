@@ -0,0 +1,213 @@
+"""Pre-aggregated sales rollups in the ``order_rollups`` collection.
+
+Every order contributes to one daily and one hourly bucket, chosen by its
+creation time in the restaurant's time zone (``ROLLUP_UTC_OFFSET_MINUTES``,
+default IST). Bucket ids sort chronologically (``day:2026-10-18``,
+``hour:2026-10-18T19``), so a date range is an ``_id`` range scan. Each
+bucket holds::
+
+    orders, gross_revenue, net_revenue,
+    by_status.<order_status>, by_payment_status.<payment_status>,
+    by_delivery_type.<delivery_type>,
+    items.<item_id>.quantity / .revenue        (daily buckets only)
+
+``by_status`` counts the *current* status of the orders created in the
+bucket. Cancelled orders stay in ``gross_revenue`` but leave
+``net_revenue`` and the item totals.
+
+Order creation and status changes apply ``$inc`` updates in the background
+(``record_created`` / ``record_transition``); ``drain`` waits for them at
+shutdown. A failed update is logged and can be repaired by rebuilding from
+live and archived orders in one streaming pass::
+
+    python -m utils.rollups backfill
+
+Run the backfill while writes are quiet: changes made during the pass may
+be overwritten.
+"""
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from datetime import timedelta
+
+from pymongo import ReplaceOne, UpdateOne
+
+from utils import archive
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = "order_rollups"
+UTC_OFFSET = timedelta(minutes=int(os.environ.get("ROLLUP_UTC_OFFSET_MINUTES", "330")))
+BACKFILL_BATCH_SIZE = 1000
+ORDER_PROJECTION = {
+    "_id": 0, "order_id": 1, "items": 1, "total": 1, "order_status": 1, "payment_status": 1,
+    "delivery_type": 1, "created_at": 1,
+}
+
+_pending = set()
+
+
+def local_time(created_at):
+    return created_at + UTC_OFFSET
+
+
+def day_id(local):
+    return f"day:{local:%Y-%m-%d}"
+
+
+def hour_id(local):
+    return f"hour:{local:%Y-%m-%dT%H}"
+
+
+def bucket_ids(created_at):
+    local = local_time(created_at)
+    return day_id(local), hour_id(local)
+
+
+def _item_changes(order, sign):
+    changes = {}
+    for item in order.get("items", ()):
+        prefix = f"items.{item['item_id']}"
+        changes[f"{prefix}.quantity"] = changes.get(f"{prefix}.quantity", 0) + sign * item["quantity"]
+        changes[f"{prefix}.revenue"] = changes.get(f"{prefix}.revenue", 0) + sign * item["price"] * item["quantity"]
+    return changes
+
+
+def created_changes(order):
+    """Counter increments for a newly created order, as ``(shared, daily_only)``"""
+    shared = {
+        "orders": 1,
+        "gross_revenue": order["total"],
+        f"by_status.{order['order_status']}": 1,
+        f"by_payment_status.{order['payment_status']}": 1,
+        f"by_delivery_type.{order['delivery_type']}": 1,
+    }
+    daily = {}
+    if order["order_status"] != "cancelled":
+        shared["net_revenue"] = order["total"]
+        daily = _item_changes(order, 1)
+    return shared, daily
+
+
+def transition_changes(order, changes):
+    """Counter increments for ``changes`` applied to ``order`` (its state before the change)"""
+    shared = {}
+    daily = {}
+    for field, group in (("order_status", "by_status"), ("payment_status", "by_payment_status")):
+        if field in changes and changes[field] != order.get(field):
+            shared[f"{group}.{order.get(field)}"] = -1
+            shared[f"{group}.{changes[field]}"] = 1
+    was_cancelled = order.get("order_status") == "cancelled"
+    is_cancelled = changes.get("order_status", order.get("order_status")) == "cancelled"
+    if is_cancelled != was_cancelled:
+        sign = -1 if is_cancelled else 1
+        shared["net_revenue"] = sign * order["total"]
+        daily = _item_changes(order, sign)
+    return shared, daily
+
+
+async def apply(db, created_at, shared, daily):
+    day, hour = bucket_ids(created_at)
+    local = local_time(created_at)
+    requests = [
+        UpdateOne(
+            {"_id": day},
+            {"$inc": {**shared, **daily}, "$setOnInsert": {"granularity": "day", "bucket": local.replace(hour=0, minute=0, second=0, microsecond=0)}},
+            upsert=True
+        ),
+        UpdateOne(
+            {"_id": hour},
+            {"$inc": shared, "$setOnInsert": {"granularity": "hour", "bucket": local.replace(minute=0, second=0, microsecond=0)}},
+            upsert=True
+        ),
+    ]
+    await db[COLLECTION].bulk_write(requests, ordered=False)
+
+
+def _schedule(db, created_at, shared, daily):
+    if not shared and not daily:
+        return
+
+    async def run():
+        try:
+            await apply(db, created_at, shared, daily)
+        except Exception as e:
+            logger.error(f"Failed to update order rollups: {str(e)}")
+
+    task = asyncio.create_task(run())
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+
+
+def record_created(db, order):
+    _schedule(db, order["created_at"], *created_changes(order))
+
+
+def record_transition(db, order, changes):
+    _schedule(db, order["created_at"], *transition_changes(order, changes))
+
+
+async def drain():
+    if _pending:
+        await asyncio.gather(*list(_pending), return_exceptions=True)
+
+
+def _add(target, changes):
+    for path, value in changes.items():
+        node = target
+        *parents, leaf = path.split(".")
+        for key in parents:
+            node = node.setdefault(key, {})
+        node[leaf] = node.get(leaf, 0) + value
+
+
+async def backfill(db, batch_size=BACKFILL_BATCH_SIZE):
+    """Rebuild every bucket from live and archived orders; returns the number of orders read"""
+    buckets = defaultdict(dict)
+    count = 0
+    # Archived orders count too; merged() reads both collections in one ordered pass
+    async for order in archive.merged(db, "orders", {}, ORDER_PROJECTION, ("created_at", "order_id"), batch_size):
+        shared, daily = created_changes(order)
+        local = local_time(order["created_at"])
+        day, hour = day_id(local), hour_id(local)
+        if day not in buckets:
+            buckets[day].update(granularity="day", bucket=local.replace(hour=0, minute=0, second=0, microsecond=0))
+        if hour not in buckets:
+            buckets[hour].update(granularity="hour", bucket=local.replace(minute=0, second=0, microsecond=0))
+        _add(buckets[day], {**shared, **daily})
+        _add(buckets[hour], shared)
+        count += 1
+
+    collection = db[COLLECTION]
+    requests = [ReplaceOne({"_id": bucket_id}, document, upsert=True) for bucket_id, document in buckets.items()]
+    for start in range(0, len(requests), batch_size):
+        await collection.bulk_write(requests[start:start + batch_size], ordered=False)
+    await collection.delete_many({"_id": {"$nin": list(buckets)}})
+    logger.info(f"Rebuilt {len(buckets)} rollup buckets from {count} orders")
+    return count
+
+
+async def _main(argv=None):
+    import argparse
+    from pathlib import Path
+
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    parser = argparse.ArgumentParser(prog="python -m utils.rollups")
+    parser.add_argument("command", choices=["backfill"])
+    parser.add_argument("--batch-size", type=int, default=BACKFILL_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    load_dotenv(Path(__file__).parent.parent / ".env")
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+    try:
+        await backfill(client[os.environ.get("DB_NAME", "restaurant_db")], args.batch_size)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    asyncio.run(_main())
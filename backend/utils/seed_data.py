@@ -1,4 +1,18 @@
 # Seed data for menu items based on mock.js
+import hashlib
+import json
+import logging
+from datetime import datetime
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from utils import ratings
+from utils.menu_cache import bump_version
+
+logger = logging.getLogger(__name__)
+
+SEED_META_ID = "seed"
 
 menu_seed_data = [
     # Tandoori Momos
@@ -119,6 +133,7 @@ menu_seed_data = [
 
 reviews_seed_data = [
     {
+        "seed_key": "review-1",
         "name": "Rahul Kumar",
         "rating": 5,
         "date": "2 weeks ago",
@@ -127,6 +142,7 @@ reviews_seed_data = [
         "is_approved": True
     },
     {
+        "seed_key": "review-2",
         "name": "Priya Singh",
         "rating": 4,
         "date": "1 month ago",
@@ -135,6 +151,7 @@ reviews_seed_data = [
         "is_approved": True
     },
     {
+        "seed_key": "review-3",
         "name": "Amit Sharma",
         "rating": 5,
         "date": "3 weeks ago",
@@ -143,6 +160,7 @@ reviews_seed_data = [
         "is_approved": True
     },
     {
+        "seed_key": "review-4",
         "name": "Sneha Verma",
         "rating": 4,
         "date": "1 week ago",
@@ -152,20 +170,84 @@ reviews_seed_data = [
     }
 ]
 
+def _fingerprint(value):
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _is_duplicate_only(error: BulkWriteError):
+    """Concurrent workers seeding at once race on the unique index; that is harmless"""
+    return all(write_error.get("code") == 11000 for write_error in error.details.get("writeErrors", []))
+
+
 async def seed_database(db):
-    """Seed the database with initial data"""
-    # Clear existing data
-    await db.menu_items.delete_many({})
-    await db.reviews.delete_many({})
-    
-    # Insert menu items
-    if menu_seed_data:
-        await db.menu_items.insert_many(menu_seed_data)
-        print(f"Seeded {len(menu_seed_data)} menu items")
-    
-    # Insert reviews
-    if reviews_seed_data:
-        await db.reviews.insert_many(reviews_seed_data)
-        print(f"Seeded {len(reviews_seed_data)} reviews")
-    
-    print("Database seeding completed!")
\ No newline at end of file
+    """Bring the seed menu items and reviews up to date.
+
+    A content hash of the whole seed set is kept in the ``meta`` collection.
+    When it matches, this is a single ``find_one``. When it does not, only the
+    items and reviews whose own fingerprint changed are upserted, with one
+    ``bulk_write`` per collection; nothing is deleted, so customer reviews and
+    manual menu edits outside the seed set survive.
+    """
+    seed_hash = _fingerprint({"menu_items": menu_seed_data, "reviews": reviews_seed_data})
+    meta = await db.meta.find_one({"_id": SEED_META_ID}) or {}
+    if meta.get("hash") == seed_hash:
+        logger.info("Seed data is up to date")
+        return False
+
+    now = datetime.utcnow()
+    applied_items = meta.get("menu_items", {})
+    applied_reviews = meta.get("reviews", {})
+    item_hashes = {str(item["item_id"]): _fingerprint(item) for item in menu_seed_data}
+    review_hashes = {review["seed_key"]: _fingerprint(review) for review in reviews_seed_data}
+
+    menu_ops = [
+        UpdateOne(
+            {"item_id": item["item_id"]},
+            {"$set": {**item, "updated_at": now}, "$setOnInsert": {"created_at": now}},
+            upsert=True
+        )
+        for item in menu_seed_data
+        if applied_items.get(str(item["item_id"])) != item_hashes[str(item["item_id"])]
+    ]
+    # Items dropped from the seed set are withdrawn, not deleted
+    menu_ops += [
+        UpdateOne({"item_id": int(item_id)}, {"$set": {"is_available": False, "updated_at": now}})
+        for item_id in applied_items
+        if item_id not in item_hashes
+    ]
+    review_ops = [
+        UpdateOne(
+            # Databases seeded before seed keys existed match on content instead
+            {"$or": [
+                {"seed_key": review["seed_key"]},
+                {"seed_key": {"$exists": False}, "name": review["name"], "review": review["review"]}
+            ]},
+            {"$set": dict(review), "$setOnInsert": {"created_at": now}},
+            upsert=True
+        )
+        for review in reviews_seed_data
+        if applied_reviews.get(review["seed_key"]) != review_hashes[review["seed_key"]]
+    ]
+
+    for collection, ops in ((db.menu_items, menu_ops), (db.reviews, review_ops)):
+        if not ops:
+            continue
+        try:
+            result = await collection.bulk_write(ops, ordered=False)
+            logger.info(f"Seeded {collection.name}: {result.upserted_count} inserted, {result.modified_count} updated")
+        except BulkWriteError as e:
+            if not _is_duplicate_only(e):
+                raise
+
+    await db.meta.update_one(
+        {"_id": SEED_META_ID},
+        {"$set": {"hash": seed_hash, "menu_items": item_hashes, "reviews": review_hashes, "applied_at": now}},
+        upsert=True
+    )
+    if menu_ops:
+        # Let every worker know the menu changed
+        await bump_version(db)
+    if review_ops:
+        await ratings.rebuild(db)
+    logger.info("Database seeding completed!")
+    return True
@@ -0,0 +1,205 @@
+"""Optional write-behind batching for fire-and-forget inserts.
+
+With ``WRITE_BEHIND_ENABLED`` set, contact messages and review submissions are
+acknowledged as soon as they are validated and queued in memory. A background
+task per collection flushes the queue with one ``insert_many`` when it holds
+``WRITE_BEHIND_BATCH_SIZE`` documents or ``WRITE_BEHIND_FLUSH_MS`` after the
+first queued document, whichever comes first. The queue is bounded: when it is
+full, ``put`` waits up to ``WRITE_BEHIND_ENQUEUE_TIMEOUT_MS`` and then raises
+``WriteBehindFull`` so the route can shed load. ``stop`` drains everything
+still queued before shutdown. Each flush is timed in the
+``write_behind_flush_duration_seconds`` histogram.
+"""
+import asyncio
+import logging
+import os
+import time
+
+from pymongo.errors import BulkWriteError
+
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get("WRITE_BEHIND_ENABLED", "false").lower() in ("1", "true", "yes")
+BATCH_SIZE = int(os.environ.get("WRITE_BEHIND_BATCH_SIZE", "100"))
+FLUSH_MS = float(os.environ.get("WRITE_BEHIND_FLUSH_MS", "50"))
+MAX_PENDING = int(os.environ.get("WRITE_BEHIND_MAX_PENDING", "10000"))
+ENQUEUE_TIMEOUT_MS = float(os.environ.get("WRITE_BEHIND_ENQUEUE_TIMEOUT_MS", "500"))
+FLUSH_RETRIES = 3
+
+COLLECTIONS = ("contact_messages", "reviews")
+
+_STOP = object()
+
+flush_latency = metrics.register(metrics.Histogram(
+    "write_behind_flush_duration_seconds", "Write-behind flush latency per batch, including retries", ("collection",)
+))
+
+
+class WriteBehindFull(Exception):
+    """The queue stayed full for longer than the enqueue timeout"""
+
+
+class WriteBehindClosed(Exception):
+    """The queue is shutting down and no longer accepts documents"""
+
+
+class WriteBehindQueue:
+    def __init__(self, collection, batch_size=BATCH_SIZE, flush_ms=FLUSH_MS,
+                 max_pending=MAX_PENDING, enqueue_timeout_ms=ENQUEUE_TIMEOUT_MS):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_delay = flush_ms / 1000
+        self.enqueue_timeout = enqueue_timeout_ms / 1000
+        self._queue = asyncio.Queue(maxsize=max_pending)
+        self._task = None
+        self._closed = False
+
+        self.enqueued = 0
+        self.rejected = 0
+        self.flushed = 0
+        self.failed = 0
+        self.flushes = 0
+        self.last_flush_seconds = 0.0
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def put(self, document):
+        if self._closed:
+            raise WriteBehindClosed()
+        try:
+            await asyncio.wait_for(self._queue.put(document), self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise WriteBehindFull()
+        self.enqueued += 1
+
+    async def stop(self):
+        """Stop accepting documents and flush everything already queued"""
+        if self._task is None:
+            return
+        self._closed = True
+        # The sentinel lands behind every queued document, so the worker
+        # flushes them all before it exits
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            document = await self._queue.get()
+            if document is _STOP:
+                break
+            batch = [document]
+            deadline = loop.time() + self.flush_delay
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    document = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if document is _STOP:
+                    stopping = True
+                    break
+                batch.append(document)
+            await self._flush(batch)
+
+    async def _flush(self, batch):
+        started = time.perf_counter()
+        for attempt in range(1, FLUSH_RETRIES + 1):
+            try:
+                # ordered=False lets the rest of the batch land if one document fails
+                await self.collection.insert_many(batch, ordered=False)
+                self.flushed += len(batch)
+                break
+            except BulkWriteError as e:
+                # Per-document errors will not go away on retry; duplicate keys
+                # mean an earlier attempt already wrote the document
+                errors = [error for error in e.details.get("writeErrors", []) if error.get("code") != 11000]
+                self.flushed += len(batch) - len(errors)
+                self.failed += len(errors)
+                for error in errors:
+                    logger.error(f"Write-behind insert into {self.collection.name} rejected: {error.get('errmsg')}")
+                break
+            except Exception as e:
+                if attempt == FLUSH_RETRIES:
+                    self.failed += len(batch)
+                    logger.error(f"Write-behind flush to {self.collection.name} failed, dropped {len(batch)} documents: {str(e)}")
+                else:
+                    logger.warning(f"Write-behind flush to {self.collection.name} failed (attempt {attempt}): {str(e)}")
+                    await asyncio.sleep(0.1 * attempt)
+        elapsed = time.perf_counter() - started
+        self.flushes += 1
+        self.last_flush_seconds = elapsed
+        flush_latency.observe((self.collection.name,), elapsed)
+
+    def stats(self):
+        return {
+            "depth": self._queue.qsize(),
+            "capacity": self._queue.maxsize,
+            "enqueued": self.enqueued,
+            "rejected": self.rejected,
+            "flushed": self.flushed,
+            "failed": self.failed,
+            "flushes": self.flushes,
+            "last_flush_seconds": self.last_flush_seconds,
+        }
+
+
+_queues = {}
+
+
+def get_queue(collection_name):
+    """Return the running queue for a collection, or None when write-behind is off"""
+    return _queues.get(collection_name)
+
+
+async def insert(db, collection_name, document):
+    """Queue ``document`` when write-behind is on for the collection, else insert it now.
+
+    Raises ``WriteBehindFull`` when the queue stays saturated.
+    """
+    queue = _queues.get(collection_name)
+    if queue is not None:
+        try:
+            await queue.put(document)
+            return
+        except WriteBehindClosed:
+            pass
+    await db[collection_name].insert_one(document)
+
+
+def start(db):
+    if not ENABLED:
+        return
+    for name in COLLECTIONS:
+        queue = WriteBehindQueue(db[name])
+        queue.start()
+        _queues[name] = queue
+    logger.info(f"Write-behind enabled for {', '.join(COLLECTIONS)} (batch {BATCH_SIZE}, {FLUSH_MS} ms)")
+
+
+async def stop():
+    for name, queue in list(_queues.items()):
+        await queue.stop()
+        logger.info(f"Write-behind queue for {name} drained: {queue.stats()}")
+    _queues.clear()
+
+
+def stats():
+    return {name: queue.stats() for name, queue in _queues.items()}
+
+
+for _field in ("depth", "enqueued", "rejected", "flushed", "failed", "flushes"):
+    metrics.register_gauge(
+        f"write_behind_{_field}",
+        f"Write-behind queue {_field.replace('_', ' ')}",
+        ("collection",),
+        lambda field=_field: {(name,): queue_stats[field] for name, queue_stats in stats().items()},
+    )
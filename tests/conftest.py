@@ -0,0 +1,56 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+# Settings are read at import time; the app never connects to this URL because
+# every test swaps in an in-memory mongomock database
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+
+def order_body(**overrides):
+    """A valid POST /api/orders body for a seeded menu item"""
+    return {
+        "customer_name": "Test Customer",
+        "customer_phone": "9810000000",
+        "delivery_address": "Zila School Rd, Bhagalpur",
+        "delivery_type": "delivery",
+        "items": [{"item_id": 101, "quantity": 2}],
+        "payment_method": "cod",
+        **overrides,
+    }
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db():
+    from mongomock_motor import AsyncMongoMockClient
+
+    import server
+
+    database = AsyncMongoMockClient()["restaurant_test"]
+    server.set_db(database)
+    await server.startup_event()
+    yield database
+    if server.orders.order_writer is not None:
+        await server.orders.order_writer.drain()
+
+
+@pytest.fixture
+async def client(db):
+    import httpx
+
+    import server
+
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http_client:
+        yield http_client
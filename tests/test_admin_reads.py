@@ -0,0 +1,27 @@
+import pytest
+
+from utils import admin
+
+pytestmark = pytest.mark.anyio
+
+GUARDED_READS = [
+    "/api/orders/export",
+    "/api/contact/export",
+    "/api/orders/summary",
+    "/api/orders/kitchen",
+    "/api/analytics/daily",
+    "/api/analytics/hourly",
+    "/api/analytics/items",
+]
+
+
+@pytest.fixture(autouse=True)
+def admin_token(monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "secret")
+
+
+@pytest.mark.parametrize("path", GUARDED_READS)
+async def test_staff_reads_require_the_admin_token(client, path):
+    assert (await client.get(path)).status_code == 401
+    assert (await client.get(path, headers={"X-Admin-Token": "wrong"})).status_code == 401
+    assert (await client.get(path, headers={"X-Admin-Token": "secret"})).status_code == 200
@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from utils import admin, archive
+
+pytestmark = pytest.mark.anyio
+
+MESSAGE_BODY = {
+    "name": "Test Customer",
+    "phone": "9810000000",
+    "message": "Do you cater for weddings?",
+}
+
+
+@pytest.fixture(autouse=True)
+def admin_token(monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "secret")
+
+
+async def inbox(client):
+    response = await client.get("/api/contact/messages")
+    assert response.status_code == 200
+    return response.json()
+
+
+async def test_only_read_messages_are_archived(client, db):
+    for _ in range(2):
+        assert (await client.post("/api/contact", json=MESSAGE_BODY)).status_code == 200
+    read, unread = await inbox(client)
+
+    marked = await client.post(f"/api/contact/messages/{read['id']}/read", headers={"X-Admin-Token": "secret"})
+    assert marked.status_code == 200
+    assert marked.json()["is_read"] is True
+
+    later = datetime.utcnow() + timedelta(days=archive.MESSAGE_DAYS + 1)
+    assert await archive.archive_collection(db, "contact_messages", now=later) == 1
+    assert [message["id"] for message in await inbox(client)] == [unread["id"]]
+    assert await db[archive.MESSAGES_ARCHIVE].count_documents({"is_read": True}) == 1
+
+
+async def test_marking_read_requires_the_admin_token(client, db):
+    await client.post("/api/contact", json=MESSAGE_BODY)
+    [message] = await inbox(client)
+
+    assert (await client.post(f"/api/contact/messages/{message['id']}/read")).status_code == 401
+    missing = await client.post("/api/contact/messages/not-an-id/read", headers={"X-Admin-Token": "secret"})
+    assert missing.status_code == 404
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+from pymongo.errors import BulkWriteError, DuplicateKeyError, WriteError
+
+from utils.group_commit import GroupCommitter
+
+pytestmark = pytest.mark.anyio
+
+
+class ScriptedCollection:
+    """Records insert_many calls and raises the scripted error for each, if any"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+
+    async def insert_many(self, documents, ordered=True):
+        self.calls.append([document["n"] for document in documents])
+        outcome = self.outcomes.pop(0) if self.outcomes else None
+        if outcome is not None:
+            raise outcome
+
+
+def bulk_error(write_errors=(), write_concern_errors=()):
+    return BulkWriteError({
+        "writeErrors": list(write_errors),
+        "writeConcernErrors": list(write_concern_errors),
+        "nInserted": 0,
+    })
+
+
+async def insert_batch(collection, count=3):
+    """Insert ``count`` documents as one batch; returns each caller's result or exception"""
+    committer = GroupCommitter(collection, window_ms=1000, max_batch=count)
+    return await asyncio.gather(*(committer.insert({"n": n}) for n in range(count)), return_exceptions=True)
+
+
+async def test_batch_is_written_with_one_insert_many():
+    collection = ScriptedCollection()
+
+    assert await insert_batch(collection) == [None, None, None]
+    assert collection.calls == [[0, 1, 2]]
+
+
+async def test_duplicate_fails_only_its_caller_and_later_documents_are_retried():
+    collection = ScriptedCollection(bulk_error([{"index": 1, "code": 11000, "errmsg": "duplicate key"}]))
+
+    first, second, third = await insert_batch(collection)
+
+    assert first is None
+    assert isinstance(second, DuplicateKeyError)
+    assert third is None
+    assert collection.calls == [[0, 1, 2], [2]]
+
+
+async def test_other_write_errors_map_to_write_error():
+    collection = ScriptedCollection(bulk_error([{"index": 0, "code": 121, "errmsg": "validation failed"}]))
+
+    first, second, third = await insert_batch(collection)
+
+    assert isinstance(first, WriteError) and not isinstance(first, DuplicateKeyError)
+    assert (second, third) == (None, None)
+    assert collection.calls == [[0, 1, 2], [1, 2]]
+
+
+async def test_write_concern_error_alone_counts_as_committed():
+    collection = ScriptedCollection(bulk_error(write_concern_errors=[{"code": 64, "errmsg": "waiting for replication timed out"}]))
+
+    assert await insert_batch(collection) == [None, None, None]
+    assert collection.calls == [[0, 1, 2]]
+
+
+async def test_write_concern_error_with_a_write_error_still_fails_that_caller():
+    collection = ScriptedCollection(bulk_error(
+        [{"index": 2, "code": 11000, "errmsg": "duplicate key"}],
+        [{"code": 64, "errmsg": "waiting for replication timed out"}],
+    ))
+
+    first, second, third = await insert_batch(collection)
+
+    assert (first, second) == (None, None)
+    assert isinstance(third, DuplicateKeyError)
+    assert collection.calls == [[0, 1, 2]]
+
+
+async def test_unexpected_error_fails_every_remaining_caller():
+    collection = ScriptedCollection(ConnectionError("connection reset"))
+
+    results = await insert_batch(collection)
+
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert collection.calls == [[0, 1, 2]]
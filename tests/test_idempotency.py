@@ -0,0 +1,122 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from models.order import OrderCreate
+from tests.conftest import order_body
+from utils import idempotency
+
+pytestmark = pytest.mark.anyio
+
+
+
+@pytest.fixture(autouse=True)
+def fresh_store(monkeypatch):
+    # The store's in-memory cache would otherwise carry keys between tests
+    monkeypatch.setattr(idempotency, "store", idempotency.IdempotencyStore())
+
+
+def post_order(client, key, body=None):
+    return client.post("/api/orders", json=body or order_body(), headers={"Idempotency-Key": key})
+
+
+async def test_replay_returns_the_original_order(client, db):
+    first = await post_order(client, "replay")
+    second = await post_order(client, "replay")
+
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert second.json()["order_id"] == first.json()["order_id"]
+    assert "Idempotent-Replayed" not in first.headers
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert await db.orders.count_documents({}) == 1
+
+
+async def test_replay_survives_a_cold_cache(client, db, monkeypatch):
+    first = await post_order(client, "restart")
+    # A new store has an empty cache, like another worker or a restarted one
+    monkeypatch.setattr(idempotency, "store", idempotency.IdempotencyStore())
+    second = await post_order(client, "restart")
+
+    assert second.status_code == 200
+    assert second.json()["order_id"] == first.json()["order_id"]
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert await db.orders.count_documents({}) == 1
+
+
+async def test_key_reused_with_a_different_body_is_rejected(client, db):
+    await post_order(client, "conflict")
+    response = await post_order(client, "conflict", order_body(items=[{"item_id": 101, "quantity": 3}]))
+
+    assert response.status_code == 422
+    assert await db.orders.count_documents({}) == 1
+
+
+async def test_concurrent_duplicates_create_one_order(client, db):
+    responses = await asyncio.gather(*(post_order(client, "burst") for _ in range(5)))
+
+    assert [response.status_code for response in responses] == [200] * 5
+    assert len({response.json()["order_id"] for response in responses}) == 1
+    assert sum(response.headers.get("Idempotent-Replayed") == "true" for response in responses) == 4
+    assert await db.orders.count_documents({}) == 1
+
+
+async def test_failed_request_releases_the_key(client, db):
+    rejected = await post_order(client, "release", order_body(items=[{"item_id": 999999, "quantity": 1}]))
+    assert rejected.status_code == 422
+    assert await db[idempotency.COLLECTION].count_documents({}) == 0
+
+    # The corrected order can be retried under the same key
+    accepted = await post_order(client, "release")
+    assert accepted.status_code == 200
+    assert "Idempotent-Replayed" not in accepted.headers
+    assert await db.orders.count_documents({}) == 1
+
+
+async def test_pending_claim_is_in_progress_until_its_lease_expires(client, db):
+    now = datetime.utcnow()
+    await db[idempotency.COLLECTION].insert_one({
+        "_id": "orders:abandoned",
+        "fingerprint": idempotency.fingerprint(OrderCreate(**order_body()).model_dump_json()),
+        "status": "pending",
+        "claim": "dead-worker",
+        "claimed_at": now,
+        "created_at": now,
+    })
+
+    busy = await post_order(client, "abandoned")
+    assert busy.status_code == 409
+    assert busy.headers["Retry-After"] == "1"
+
+    await db[idempotency.COLLECTION].update_one(
+        {"_id": "orders:abandoned"},
+        {"$set": {"claimed_at": now - timedelta(seconds=idempotency.LEASE_SECONDS + 1)}}
+    )
+    taken_over = await post_order(client, "abandoned")
+    assert taken_over.status_code == 200
+    assert await db.orders.count_documents({}) == 1
+
+    replayed = await post_order(client, "abandoned")
+    assert replayed.json()["order_id"] == taken_over.json()["order_id"]
+    assert replayed.headers["Idempotent-Replayed"] == "true"
+
+
+async def test_replays_do_not_use_the_phone_budget(client, db, monkeypatch):
+    from utils import rate_limit
+
+    monkeypatch.setattr(rate_limit, "ENABLED", True)
+    monkeypatch.setattr(rate_limit, "backend", rate_limit.LocalBackend())
+    monkeypatch.setitem(rate_limit.limits, ("orders", "phone"), rate_limit.parse_limit("1/600"))
+
+    first = await post_order(client, "budget")
+    # A cold cache sends the replay check to the stored record
+    monkeypatch.setattr(idempotency, "store", idempotency.IdempotencyStore())
+    replayed = await post_order(client, "budget")
+    assert first.status_code == replayed.status_code == 200
+    assert replayed.headers["Idempotent-Replayed"] == "true"
+
+    # A new order is over the limit and is turned away before claiming its key
+    limited = await post_order(client, "budget-2")
+    assert limited.status_code == 429
+    assert await db[idempotency.COLLECTION].count_documents({"_id": "orders:budget-2"}) == 0
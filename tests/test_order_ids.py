@@ -0,0 +1,46 @@
+import pytest
+
+from tests.conftest import order_body
+from utils import ids
+
+pytestmark = pytest.mark.anyio
+
+
+class ReplayingGenerator:
+    """Hands out the given ids first, like a second worker sharing our worker number"""
+
+    def __init__(self, *order_ids):
+        self.order_ids = list(order_ids)
+        self.fallback = ids.SnowflakeGenerator(worker=1)
+
+    def next_id(self):
+        return self.order_ids.pop(0) if self.order_ids else self.fallback.next_id()
+
+
+@pytest.fixture
+def generator():
+    original = ids._generator
+    yield lambda *order_ids: ids.set_generator(ReplayingGenerator(*order_ids))
+    ids.set_generator(original)
+
+
+def test_ids_sort_by_creation_time():
+    clock = iter([1_800_000_000.000, 1_800_000_000.000, 1_800_000_000.001, 1_799_999_999.0])
+    generator = ids.SnowflakeGenerator(worker=7, clock=lambda: next(clock))
+
+    generated = [generator.next_id() for _ in range(4)]
+
+    assert generated == sorted(generated)
+    assert len(set(generated)) == 4
+    assert all(len(order_id) == len(ids.PREFIX) + ids.ID_LENGTH for order_id in generated)
+
+
+async def test_duplicate_order_id_is_retried_with_a_new_id(client, db, generator):
+    generator("ORDTAKEN")
+    await db.orders.insert_one({"order_id": "ORDTAKEN"})
+
+    response = await client.post("/api/orders", json=order_body())
+
+    assert response.status_code == 200
+    assert response.json()["order_id"] != "ORDTAKEN"
+    assert await db.orders.count_documents({}) == 2
@@ -0,0 +1,110 @@
+import pytest
+
+from models.order import OrderItemCreate
+from utils.pricing import CartError, PricingTable, Promotion, build_lines
+
+MENU = {
+    1: {"item_id": 1, "name": "Veg Momos", "price": 120, "category": "Momos", "is_available": True},
+    2: {"item_id": 2, "name": "Tandoori Momos", "price": 180, "category": "Momos", "is_available": True},
+    3: {"item_id": 3, "name": "Cold Coffee", "price": 90, "category": "Drinks", "is_available": True},
+    4: {"item_id": 4, "name": "Seasonal Special", "price": 250, "category": "Momos", "is_available": False},
+}
+
+
+def cart(*pairs):
+    return [OrderItemCreate(item_id=item_id, quantity=quantity) for item_id, quantity in pairs]
+
+
+def lines(*pairs):
+    return build_lines(MENU, cart(*pairs))
+
+
+def test_build_lines_prices_from_the_menu():
+    priced = build_lines(MENU, [OrderItemCreate(item_id=1, quantity=2, name="Free Momos", price=1)])
+
+    assert priced == [{"item_id": 1, "name": "Veg Momos", "price": 120, "quantity": 2, "category": "Momos"}]
+
+
+def test_build_lines_reports_unknown_and_unavailable_items():
+    with pytest.raises(CartError) as error:
+        build_lines(MENU, cart((1, 1), (99, 1), (4, 1), (99, 2)))
+
+    assert error.value.detail["unknown_items"] == [99]
+    assert error.value.detail["unavailable_items"] == [4]
+
+
+def test_default_table_charges_delivery_only():
+    quote = PricingTable({}).quote(lines((1, 2), (3, 1)), "delivery")
+
+    assert quote == {
+        "subtotal": 330, "discount": 0, "delivery_charge": 30, "tax": 0, "total": 360, "promotion": None,
+    }
+    assert PricingTable({}).quote(lines((1, 1)), "pickup")["delivery_charge"] == 0
+
+
+def test_free_delivery_threshold_and_tax():
+    table = PricingTable({"free_delivery_above": 300, "tax_percent": 5})
+
+    small = table.quote(lines((1, 1)), "delivery")
+    large = table.quote(lines((2, 2)), "delivery")
+
+    assert (small["delivery_charge"], small["tax"], small["total"]) == (30, 6, 156)
+    assert (large["delivery_charge"], large["tax"], large["total"]) == (0, 18, 378)
+
+
+def test_percent_code_respects_cap_minimum_and_category():
+    table = PricingTable({"promotions": [
+        {"code": "MOMO10", "type": "percent", "value": 10, "max_discount": 30, "min_subtotal": 200, "category": "Momos"},
+    ]})
+
+    quote = table.quote(lines((1, 1), (2, 1), (3, 1)), "delivery", "momo10")
+    assert quote["discount"] == 30  # 10% of 300 in Momos, no cap hit
+    assert quote["total"] == 390 - 30 + 30
+    assert quote["promotion"] == {"code": "MOMO10", "type": "percent", "savings": 30}
+
+    capped = table.quote(lines((2, 3)), "delivery", "MOMO10")
+    assert capped["discount"] == 30  # 10% of 540 capped at 30
+
+    with pytest.raises(CartError):
+        table.quote(lines((1, 1)), "delivery", "MOMO10")  # below min_subtotal
+    with pytest.raises(CartError):
+        table.quote(lines((3, 3)), "delivery", "MOMO10")  # no Momos in the cart
+
+
+def test_unknown_code_is_rejected():
+    with pytest.raises(CartError) as error:
+        PricingTable({}).quote(lines((1, 1)), "delivery", "NOPE")
+
+    assert error.value.detail["promo_code"] == "NOPE"
+
+
+def test_best_automatic_promotion_applies():
+    table = PricingTable({"promotions": [
+        {"type": "free_delivery", "auto": True, "min_subtotal": 100},
+        {"type": "flat", "value": 50, "auto": True, "min_subtotal": 300},
+    ]})
+
+    assert table.quote(lines((1, 1)), "delivery")["promotion"]["type"] == "free_delivery"
+    big = table.quote(lines((2, 2)), "delivery")
+    assert (big["discount"], big["delivery_charge"], big["total"]) == (50, 30, 340)
+
+
+def test_flat_discount_never_exceeds_the_base():
+    table = PricingTable({"promotions": [{"code": "BIG", "type": "flat", "value": 500}]})
+
+    quote = table.quote(lines((3, 1)), "pickup", "BIG")
+
+    assert (quote["discount"], quote["total"]) == (90, 0)
+
+
+@pytest.mark.parametrize("rule", [
+    {"code": "X", "type": "percent", "value": 150},
+    {"code": "X", "type": "percent", "value": 0},
+    {"code": "X", "type": "flat", "value": -10},
+    {"code": "X", "type": "percent", "value": 10, "max_discount": -1},
+    {"code": "X", "type": "bogo"},
+    {"type": "flat", "value": 10},
+])
+def test_invalid_promotions_are_rejected(rule):
+    with pytest.raises(ValueError):
+        Promotion(rule)
@@ -0,0 +1,80 @@
+import pytest
+
+from utils import admin, ratings
+
+pytestmark = pytest.mark.anyio
+
+ADMIN_HEADERS = {"X-Admin-Token": "test-admin-token"}
+
+
+@pytest.fixture(autouse=True)
+def admin_token(monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", ADMIN_HEADERS["X-Admin-Token"])
+
+
+async def submit_and_approve(client, rating, name="Test Reviewer"):
+    response = await client.post("/api/reviews", json={"name": name, "rating": rating, "review": "Lovely momos"})
+    assert response.status_code == 200
+    pending = (await client.get("/api/reviews/pending", headers=ADMIN_HEADERS)).json()
+    review_id = next(review["id"] for review in pending if review["name"] == name)
+    return review_id, await client.post(f"/api/reviews/{review_id}/approve", headers=ADMIN_HEADERS)
+
+
+async def stats(client):
+    ratings.invalidate()
+    return (await client.get("/api/reviews/stats")).json()
+
+
+async def test_approval_is_counted_once(client):
+    before = await stats(client)
+
+    review_id, approved = await submit_and_approve(client, 1)
+    again = await client.post(f"/api/reviews/{review_id}/approve", headers=ADMIN_HEADERS)
+
+    assert approved.status_code == 200 and approved.json()["is_approved"] is True
+    assert again.status_code == 200
+    after = await stats(client)
+    assert after["count"] == before["count"] + 1
+    assert after["histogram"]["1"] == before["histogram"]["1"] + 1
+
+
+async def test_approval_rebuilds_a_missing_aggregate_without_double_counting(client, db, monkeypatch):
+    approved_before = await db.reviews.count_documents({"is_approved": True})
+    # As on a fresh database whose startup "ratings" step failed
+    await db.meta.delete_one({"_id": ratings.META_ID})
+    monkeypatch.setattr(ratings, "_stats", None)
+
+    await submit_and_approve(client, 5)
+
+    assert (await stats(client))["count"] == approved_before + 1
+
+
+async def test_retry_finishes_a_count_interrupted_by_a_failure(client, db, monkeypatch):
+    before = await stats(client)
+    count = ratings._count
+
+    async def interrupted(database, review):
+        # The $inc lands, then the worker fails before flagging the review
+        await database.meta.update_one(
+            {"_id": ratings.META_ID},
+            {"$inc": {"count": 1, "sum": review["rating"], f"stars.{review['rating']}": 1},
+             "$push": {"pending": review["_id"]}}
+        )
+        raise RuntimeError("connection reset")
+
+    monkeypatch.setattr(ratings, "_count", interrupted)
+    review_id, failed = await submit_and_approve(client, 4)
+    assert failed.status_code == 500
+
+    monkeypatch.setattr(ratings, "_count", count)
+    retried = await client.post(f"/api/reviews/{review_id}/approve", headers=ADMIN_HEADERS)
+
+    assert retried.status_code == 200
+    after = await stats(client)
+    assert after["count"] == before["count"] + 1
+    assert after["histogram"]["4"] == before["histogram"]["4"] + 1
+    assert (await db.meta.find_one({"_id": ratings.META_ID}))["pending"] == []
+
+
+async def test_moderation_requires_the_admin_token(client):
+    assert (await client.get("/api/reviews/pending")).status_code == 401